@@ -12,6 +12,21 @@ import zipfile
 import shutil
 import subprocess
 import platform
+import queue
+import threading
+
+import decoder_core
+import encode_preview
+import encode_cache
+import encoder_core
+import grid_canvas
+import grid_history
+import grid_model
+import image_import
+import project_file
+import source_watch
+import wall_compositor
+import word_table
 
 #Update Constants
 GITHUB_USER = "McfearJnr"
@@ -117,7 +132,8 @@ BTN_STYLE_HM = {
     "font": (FONT_FAMILY, 11),
     #"fg_color": "#268f07" - lowk looks shit rn, todo: pick new color :cool_guy:
 }
-GRID_SIZE = 16
+GRID_SIZE = 16 # One panel (one EEPROM Location) is GRID_SIZE x GRID_SIZE cells
+MAX_WALL_PANELS = 16 # A wall is split into one Location per panel, and there are 16 Locations
 
 COLOR_MAP = {
     "black": "000000", "white": "111111", "gray": "111000", "red": "100100",
@@ -135,6 +151,28 @@ UI_COLORS = {
 
 REVERSE_COLOR_MAP = {v: k for k, v in COLOR_MAP.items()}
 
+# Palette RGB by grid_model palette index, for fill tolerance
+PALETTE_RGB = [tuple(int(UI_COLORS[name][i:i + 2], 16) for i in (1, 3, 5)) for name in grid_model.PALETTE]
+MAX_RGB_DISTANCE = (3 * 255 ** 2) ** 0.5
+
+# Colors bright enough to need black text on top
+LIGHT_COLORS = {"white", "yellow", "cyan", "bright_green", "bright_red", "bright_blue"}
+
+# Undo/log labels for grid_model transforms
+TRANSFORM_LABELS = {
+    "flip_h": "Flip Horizontal", "flip_v": "Flip Vertical", "transpose": "Transpose", "rotate": "Rotate 90°",
+    "rotate_ccw": "Rotate -90°", "rotate_180": "Rotate 180°", "shift": "Shift",
+}
+
+PROJECT_FILETYPES = [("BuildLogic Project", "*" + project_file.PROJECT_EXT), ("JSON Project", "*.json")]
+
+# Max characters per paste when the encoder output is split into chunks
+CHUNK_SIZES = {"Off": 0, "8K chars": 8000, "16K chars": 16000, "32K chars": 32000, "64K chars": 64000}
+ENCODE_POLL_MS = 50 # How often the Tk thread drains encode worker messages
+WATCH_POLL_MS = 1000 # How often watch mode stats the encoder source files
+PREVIEW_MS = 100 # Max refresh rate of the cell preview label while dragging
+REDRAW_LOG_MS = 1000 # Redraw counts are summed and logged at most this often
+
 class CombinedEEPROMApp(ctk.CTk):
     def __init__(self):
         super().__init__()
@@ -181,8 +219,14 @@ class CombinedEEPROMApp(ctk.CTk):
         self.reverse_char_map = {v.rjust(7, "0"): k for k, v in self.binary_chars.items()}
         
         # --- State ---
-        self.grid_data = [[{'char': ' ', 'color': 'black'} for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
-        self.cells = {} # Dictionary mapping widget to (r, c)
+        self.grid_data = grid_model.GridModel(GRID_SIZE, GRID_SIZE) # Palette/char-code planes, see grid_model.py
+        self.dirty_cells = set() # Cells changed since the last redraw
+        self.redraw_job = None # after_idle ID of the pending flush
+        self.redraw_stats = [0, 0, 0] # Flushes, cells redrawn and the largest flush since the last redraw log line
+        self.redraw_log_job = None
+        self.preview_cell = None # Latest cell for the throttled drag preview
+        self.preview_job = None
+        self.history = grid_history.GridHistory() # Undo/redo as per-cell deltas, see grid_history.py
         self.current_tool = "paint"
         self.selected_color = "red"
         self.focused_cell = None
@@ -195,9 +239,25 @@ class CombinedEEPROMApp(ctk.CTk):
         self.selection_area = None # (r1, c1, r2, c2)
         self.files_to_encode = [] 
         self.virtual_files = {} 
+        self.encode_cache = encode_cache.EncodeCache(encode_cache.default_cache_dir())
+        self.pending_chunks = [] # Paste chunks still waiting to be copied
+        self.chunk_total = 0
+        self.encode_thread = None # Background encode worker (one at a time)
+        self.encode_queue = None
+        self.encode_cancel = None
+        self.source_watcher = source_watch.SourceWatcher()
+        self.watch_timer = None # Holds the after() ID while watch mode is on
+        self.watch_changed = set() # Changed sources waiting for the current encode to finish
+        self.last_output_path = None # Watch mode re-saves to the last chosen .dat
         self.is_16bit = ctk.BooleanVar(value=True)
+        self.word_table = None # Built on first use; see get_word_table()
+        self.size_preview = None # Live encoded size of the design; see get_size_preview()
+        self.is_16bit.trace_add("write", lambda *_: self.invalidate_word_table())
         self.boot_index = ctk.StringVar(value="0") 
         self.tool_var = ctk.StringVar(value="paint")
+        self.fill_tolerance = ctk.IntVar(value=0) # Percent of the largest palette color distance
+        self.fill_match_char = ctk.BooleanVar(value=False)
+        self.image_dither = ctk.StringVar(value=image_import.DITHER_MODES[0])
         self.unsaved_changes = False
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
         self._resizing = False
@@ -230,6 +290,10 @@ class CombinedEEPROMApp(ctk.CTk):
         self.setup_charmap_tab()
         self.setup_log_tab()
         self.bind("<Key>", self.handle_keypress)
+        self.bind("<Control-z>", lambda e: self.undo_edit())
+        self.bind("<Control-y>", lambda e: self.redo_edit())
+        self.bind("<Control-Z>", lambda e: self.redo_edit()) # Ctrl+Shift+Z
+        self.bind("<Escape>", lambda e: self.deselect())
         self.clear_grid(confirm=False)
         self.after(5000, self.check_for_updates)
 
@@ -373,25 +437,8 @@ class CombinedEEPROMApp(ctk.CTk):
             return
 
     def load_char_map(self):
-        try:
-            # Load the application's local binary map file
-            with open(resource_path("BinaryChars.json"), "r", encoding="utf-8") as f:
-                return json.load(f).get("CharToBin", {})
-        except Exception:
-            # Fallback to hardcoded defaults
-            return {
-                " ": "0000000", "A": "1000000", "B": "1000001", "C": "1000010",
-                "D": "1000011", "E": "1000100", "F": "1000101", "G": "1000110",
-                "H": "1000111", "I": "1001000", "J": "1001001", "K": "1001010",
-                "L": "1001011", "M": "1001100", "N": "1001101", "O": "1001110",
-                "P": "1001111", "Q": "1010000", "R": "1010001", "S": "1010010",
-                "T": "1010011", "U": "1010100", "V": "1010101", "W": "1010110",
-                "X": "1010111", "Y": "1011000", "Z": "1011001", "0": "1100000",
-                "1": "1100001", "2": "1100010", "3": "1100011", "4": "1100100",
-                "5": "1100101", "6": "1100110", "7": "1100111", "8": "1101000",
-                "9": "1101001", ".": "1110000", "!": "1110001", "?": "1110010",
-                ":": "1110011", ",": "1110100", "'": "1110101", "-": "1110110",
-            }
+        # Load the application's local binary map file (falls back to hardcoded defaults)
+        return encoder_core.load_char_map(resource_path(encoder_core.CHARMAP_FILE))
     
     def save_char_map(self):
         data = {"CharToBin": self.binary_chars}
@@ -422,45 +469,21 @@ class CombinedEEPROMApp(ctk.CTk):
         self.draw_frame.grid_columnconfigure(0, weight=1) 
         self.draw_frame.grid_rowconfigure(0, weight=1)
 
-        self.grid_inner = tk.Frame(self.draw_frame, bg="#202020", width=900, height=900)
-
-        self.grid_inner.grid(row=0, column=0) 
-        self.grid_inner.grid_propagate(False)
-
-        for i in range(GRID_SIZE):
-            self.grid_inner.grid_columnconfigure(i, weight=1)
-            self.grid_inner.grid_rowconfigure(i, weight=1)
-
-        FONT_NAME = globals().get('FONT_FAMILY', "Arial")
-        NEW_FONT = (FONT_NAME, 22, "bold")
-        # Grid initialization (kept mostly the same for functionality)
-        self.cells = {}
-        # Assuming GRID_SIZE, UI_COLORS, and relevant commands are defined elsewhere
-        for r in range(GRID_SIZE):
-            for c in range(GRID_SIZE):
-                # Fixed: We use padding to create the gap, and NO border/highlight on creation
-                cell = tk.Label(self.grid_inner, text=" ",
-                                # ... other options ...
-                                relief="flat", bd=1,         # Set border width to 0
-                                width=1,
-                                height=1,
-                                highlightbackground=UI_COLORS["black"], # Use a base color
-                                highlightcolor=UI_COLORS["black"],      # Use a base color
-                                highlightthickness=1)                   # Set highlight thickness to 0 initially
-
-                # CRITICAL CHANGE: Use padx/pady to create the fixed gap/border space
-                BORDER_GAP = 1 # Define a fixed gap size (e.g., 1 pixel)
-                cell.grid(row=r, column=c, padx=BORDER_GAP, pady=BORDER_GAP, sticky="nsew")
-                
-                cell.bind("<Button-1>", lambda e, row=r, col=c: self.on_cell_down(e, row, col))
-                cell.bind("<B1-Motion>", self.on_cell_drag)
-                cell.bind("<ButtonRelease-1>", self.on_cell_up)
-                
-                # New: Bind hover event for live info display
-                cell.bind("<Enter>", lambda e, row=r, col=c: self.update_cell_info(row, col))
-                cell.bind("<Leave>", lambda e: self.clear_cell_info())
-                
-                self.cells[cell] = (r, c)
+        # One canvas draws the whole grid; cells are canvas items, not widgets
+        self.grid_canvas = grid_canvas.GridCanvas(self.draw_frame, GRID_SIZE, GRID_SIZE,
+                                                  on_down=self.on_cell_down, on_drag=self.on_cell_drag, on_up=self.on_cell_up,
+                                                  on_hover=self.update_cell_info, on_leave=self.clear_cell_info,
+                                                  font_family=FONT_FAMILY, width=900, height=900)
+        self.grid_canvas.grid(row=0, column=0)
+
+        # Scrollbars only show when a wall does not fit at the minimum cell size
+        self.grid_vscroll = ctk.CTkScrollbar(self.draw_frame, orientation="vertical", command=self.grid_canvas.yview)
+        self.grid_hscroll = ctk.CTkScrollbar(self.draw_frame, orientation="horizontal", command=self.grid_canvas.xview)
+        self.grid_canvas.configure(yscrollcommand=self.grid_vscroll.set, xscrollcommand=self.grid_hscroll.set)
+        self.grid_vscroll.grid(row=0, column=1, sticky="ns")
+        self.grid_hscroll.grid(row=1, column=0, sticky="ew")
+        self.grid_vscroll.grid_remove()
+        self.grid_hscroll.grid_remove()
         
         self.refresh_grid_ui()
                 
@@ -487,7 +510,16 @@ class CombinedEEPROMApp(ctk.CTk):
         ctk.CTkRadioButton(tool_frame, text="Text (Sequential Type)", variable=self.tool_var, value="text", command=self.sync_tools, font=(FONT_FAMILY, 11, "bold")).grid(row=1, column=0, sticky="w", padx=15, pady=4)
         ctk.CTkRadioButton(tool_frame, text="Line (Start & End Click)", variable=self.tool_var, value="line", command=self.sync_tools, font=(FONT_FAMILY, 11, "bold")).grid(row=2, column=0, sticky="w", padx=15, pady=4)
         ctk.CTkRadioButton(tool_frame, text="Fill (Bucket)", variable=self.tool_var, value="fill", command=self.sync_tools, font=(FONT_FAMILY, 11, "bold")).grid(row=3, column=0, sticky="w", padx=15, pady=4)
-        # Selector tool is hidden: ctk.CTkRadioButton(tool_frame, text="Select (Box Drag)", variable=self.tool_var, value="select", command=self.sync_tools, font=(FONT_FAMILY, 11)).grid(row=4, column=0, sticky="w", padx=5, pady=2)
+        fill_opts = ctk.CTkFrame(tool_frame, fg_color="transparent")
+        fill_opts.grid(row=5, column=0, sticky="ew", padx=(40, 15), pady=(0, 6))
+        fill_opts.grid_columnconfigure(1, weight=1)
+        self.lbl_fill_tolerance = ctk.CTkLabel(fill_opts, text="Tolerance: 0%", font=(FONT_FAMILY, 10), width=90, anchor="w")
+        self.lbl_fill_tolerance.grid(row=0, column=0, sticky="w")
+        ctk.CTkSlider(fill_opts, from_=0, to=100, number_of_steps=20, variable=self.fill_tolerance,
+                      command=lambda v: self.lbl_fill_tolerance.configure(text=f"Tolerance: {int(v)}%")).grid(row=0, column=1, sticky="ew")
+        ctk.CTkCheckBox(fill_opts, text="Match char too", variable=self.fill_match_char, font=(FONT_FAMILY, 10),
+                        checkbox_width=16, checkbox_height=16).grid(row=1, column=0, columnspan=2, sticky="w", pady=(4, 0))
+        ctk.CTkRadioButton(tool_frame, text="Select (Box Drag)", variable=self.tool_var, value="select", command=self.sync_tools, font=(FONT_FAMILY, 11, "bold")).grid(row=4, column=0, sticky="w", padx=15, pady=4)
         
         
         # --- 2. COLOR PALETTE ---
@@ -519,13 +551,49 @@ class CombinedEEPROMApp(ctk.CTk):
         action_frame.pack(fill="x", padx=10, pady=(0, 10))
         action_frame.grid_columnconfigure((0, 1, 2), weight=1)
         
-        # Transformation Tools (kept same structure)
+        # Transformation Tools (apply to the Select tool's box if there is one, else the whole grid; Esc deselects)
         btn_h = 35
-        ctk.CTkButton(action_frame, text="Flip Horizontal", height=btn_h, **BTN_STYLE_HM, command=lambda: self.transform_grid('flip_h')).grid(row=0, column=0, columnspan=3, padx=10, pady=(10, 5), sticky="ew")
-        
-        # New Row for Rotate and Flip V
-        ctk.CTkButton(action_frame, text="Flip Vertical", height=btn_h, **BTN_STYLE_HM, command=lambda: self.transform_grid('flip_v')).grid(row=1, column=0, columnspan=2, padx=(10, 5), pady=5, sticky="ew")
-        ctk.CTkButton(action_frame, text="Rotate ↻", height=btn_h, **BTN_STYLE_HM, command=lambda: self.transform_grid('rotate')).grid(row=1, column=2, padx=(5, 10), pady=5, sticky="ew")
+        transform_buttons = [
+            [("Flip H", 'flip_h'), ("Flip V", 'flip_v'), ("Transpose", 'transpose')],
+            [("Rotate ↻", 'rotate'), ("Rotate ↺", 'rotate_ccw'), ("Rotate 180", 'rotate_180')],
+        ]
+        for row, buttons in enumerate(transform_buttons):
+            for col, (text, action) in enumerate(buttons):
+                ctk.CTkButton(action_frame, text=text, height=btn_h, width=60, **BTN_STYLE_HM,
+                              command=lambda a=action: self.transform_grid(a)).grid(row=row, column=col, padx=(10 if col == 0 else 5, 10 if col == 2 else 5), pady=(10 if row == 0 else 5, 5), sticky="ew")
+
+        # Wrap-around shift by one cell
+        shift_frame = ctk.CTkFrame(action_frame, fg_color="transparent")
+        shift_frame.grid(row=2, column=0, columnspan=3, padx=10, pady=5, sticky="ew")
+        shift_frame.grid_columnconfigure((1, 2, 3, 4), weight=1)
+        ctk.CTkLabel(shift_frame, text="Shift", font=(FONT_FAMILY, 11, "bold")).grid(row=0, column=0, padx=(0, 5))
+        for col, (text, dr, dc) in enumerate([("◀", 0, -1), ("▲", -1, 0), ("▼", 1, 0), ("▶", 0, 1)], 1):
+            ctk.CTkButton(shift_frame, text=text, height=btn_h, width=40, **BTN_STYLE_HM,
+                          command=lambda dr=dr, dc=dc: self.transform_grid('shift', dr, dc)).grid(row=0, column=col, padx=2, sticky="ew")
+
+        # Undo / Redo (Ctrl+Z / Ctrl+Y)
+        ctk.CTkButton(action_frame, text="↶ Undo", height=btn_h, **BTN_STYLE_HM, command=self.undo_edit).grid(row=3, column=0, padx=(10, 5), pady=(5, 10), sticky="ew")
+        ctk.CTkButton(action_frame, text="Redo ↷", height=btn_h, **BTN_STYLE_HM, command=self.redo_edit).grid(row=3, column=1, columnspan=2, padx=(5, 10), pady=(5, 10), sticky="ew")
+
+
+        # --- 3b. WALL SIZE (multi-panel designs, one Location per panel) ---
+        self.create_sidebar_heading(scroll_sidebar, "🧱 Wall Size (Panels)")
+        wall_frame = ctk.CTkFrame(scroll_sidebar, fg_color=THEME["surface_2"], corner_radius=8)
+        wall_frame.pack(fill="x", padx=10, pady=(0, 10))
+        wall_frame.grid_columnconfigure((1, 3), weight=1)
+
+        self.wall_cols = ctk.StringVar(value="1")
+        self.wall_rows = ctk.StringVar(value="1")
+        panel_counts = [str(n) for n in range(1, MAX_WALL_PANELS + 1)]
+        ctk.CTkLabel(wall_frame, text="Wide", font=(FONT_FAMILY, 11, "bold")).grid(row=0, column=0, padx=(10, 5), pady=(10, 5))
+        ctk.CTkOptionMenu(wall_frame, variable=self.wall_cols, values=panel_counts, width=70, font=(FONT_FAMILY, 11)).grid(row=0, column=1, sticky="ew", pady=(10, 5))
+        ctk.CTkLabel(wall_frame, text="High", font=(FONT_FAMILY, 11, "bold")).grid(row=0, column=2, padx=(10, 5), pady=(10, 5))
+        ctk.CTkOptionMenu(wall_frame, variable=self.wall_rows, values=panel_counts, width=70, font=(FONT_FAMILY, 11)).grid(row=0, column=3, sticky="ew", padx=(0, 10), pady=(10, 5))
+        ctk.CTkButton(wall_frame, text="Apply Wall Size", height=btn_h, **BTN_STYLE_HM, command=self.apply_wall_size).grid(row=1, column=0, columnspan=4, padx=10, pady=(5, 5), sticky="ew")
+
+        # Compositor: unique 16x16 tiles go to the encoder, plus a panel -> Location map (no 16-panel limit)
+        ctk.CTkButton(wall_frame, text="Image → Tiles", height=btn_h, **BTN_STYLE_HM, command=self.composite_image_wall).grid(row=2, column=0, columnspan=2, padx=(10, 5), pady=(5, 10), sticky="ew")
+        ctk.CTkButton(wall_frame, text="Design → Tiles", height=btn_h, **BTN_STYLE_HM, command=self.composite_design_wall).grid(row=2, column=2, columnspan=2, padx=(5, 10), pady=(5, 10), sticky="ew")
 
 
         # --- 4. DATA PREVIEW ---
@@ -537,6 +605,11 @@ class CombinedEEPROMApp(ctk.CTk):
         self.lbl_cell_info = ctk.CTkLabel(preview_frame, text="Hover over a cell to see data.", justify="left", 
                                           font=("Consolas", 11), padx=10, anchor="w")
         self.lbl_cell_info.pack(fill="x", padx=10, pady=10)
+
+        # Live encoded size of the design (updated with each redraw)
+        self.lbl_encoded_size = ctk.CTkLabel(preview_frame, text="Encoded: --", justify="left",
+                                             font=("Consolas", 11), padx=10, anchor="w")
+        self.lbl_encoded_size.pack(fill="x", padx=10, pady=(0, 10))
         
         # Clear Grid Button (High visibility, kept the danger color)
         ctk.CTkButton(preview_frame, text="WIPE ENTIRE GRID", fg_color=THEME["danger"], hover_color="#b91c1c", 
@@ -550,13 +623,25 @@ class CombinedEEPROMApp(ctk.CTk):
         io_frame.grid_columnconfigure((0, 1), weight=1)
 
         # Load/Save Project (for internal state)
-        ctk.CTkButton(io_frame, text="LOAD PROJECT (.json)", height=35, **BTN_STYLE_HM, command=self.load_project).grid(row=0, column=0, padx=(10, 5), pady=(10, 5), sticky="ew")
-        ctk.CTkButton(io_frame, text="SAVE PROJECT (.json)", height=35, **BTN_STYLE_HM, command=self.save_project).grid(row=0, column=1, padx=(5, 10), pady=(10, 5), sticky="ew")
+        ctk.CTkButton(io_frame, text="LOAD PROJECT (.blp/.json)", height=35, **BTN_STYLE_HM, command=self.load_project).grid(row=0, column=0, padx=(10, 5), pady=(10, 5), sticky="ew")
+        ctk.CTkButton(io_frame, text="SAVE PROJECT (.blp/.json)", height=35, **BTN_STYLE_HM, command=self.save_project).grid(row=0, column=1, padx=(5, 10), pady=(10, 5), sticky="ew")
         
         # Import/Export .TXT (for encoder compatibility)
         ctk.CTkButton(io_frame, text="IMPORT TXT (File)", height=35, **BTN_STYLE_HM, command=self.import_designer_file).grid(row=1, column=0, padx=(10, 5), pady=(5, 5), sticky="ew")
         ctk.CTkButton(io_frame, text="EXPORT TXT (File)", height=35, **BTN_STYLE_HM, command=self.export_designer_file).grid(row=1, column=1, padx=(5, 10), pady=(5, 5), sticky="ew")
 
+        # Recover designs from an encoded paste string (inverse of the encoder)
+        ctk.CTkButton(io_frame, text="IMPORT PASTE (Clipboard)", height=35, **BTN_STYLE_HM, command=self.import_paste_clipboard).grid(row=2, column=0, padx=(10, 5), pady=(5, 10), sticky="ew")
+        ctk.CTkButton(io_frame, text="IMPORT PASTE (File)", height=35, **BTN_STYLE_HM, command=self.import_paste_file).grid(row=2, column=1, padx=(5, 10), pady=(5, 10), sticky="ew")
+
+        # Artwork -> panel colors (resampled to the wall size)
+        ctk.CTkButton(io_frame, text="IMPORT IMAGE", height=35, **BTN_STYLE_HM, command=self.import_image_file).grid(row=3, column=0, padx=(10, 5), pady=(0, 10), sticky="ew")
+        ctk.CTkOptionMenu(io_frame, variable=self.image_dither, values=list(image_import.DITHER_MODES), height=35, font=(FONT_FAMILY, 11)).grid(row=3, column=1, padx=(5, 10), pady=(0, 10), sticky="ew")
+
+        # Animations: unique frames go to the encoder, one Location each
+        ctk.CTkButton(io_frame, text="IMPORT ANIMATION (GIF)", height=35, **BTN_STYLE_HM, command=self.import_animation).grid(row=4, column=0, padx=(10, 5), pady=(0, 10), sticky="ew")
+        ctk.CTkButton(io_frame, text="IMPORT FRAMES (Folder)", height=35, **BTN_STYLE_HM, command=lambda: self.import_animation(folder=True)).grid(row=4, column=1, padx=(5, 10), pady=(0, 10), sticky="ew")
+
 
         # --- 6. ENCODER INTEGRATION ---
         self.create_sidebar_heading(scroll_sidebar, "🔗 Integration")
@@ -596,14 +681,129 @@ class CombinedEEPROMApp(ctk.CTk):
         if parent_width < 10 or parent_height < 10:
             return
 
-        square_size = min(parent_width, parent_height)
         BUFFER = 80 
-        square_size -= BUFFER
-        square_size = max(100, square_size) # Ensure it never goes below 100px
-
-        self.grid_inner.configure(width=square_size, height=square_size)
+        avail_w = max(100, parent_width - BUFFER) # Ensure it never goes below 100px
+        avail_h = max(100, parent_height - BUFFER)
+
+        # Square cells; a single panel stays a square, walls keep their aspect ratio
+        cell = self.grid_canvas.fit_cell_size(avail_w, avail_h)
+        full_w, full_h = cell * self.grid_data.cols, cell * self.grid_data.rows
+        self.grid_canvas.configure(width=min(avail_w, full_w), height=min(avail_h, full_h))
+
+        if full_w > avail_w: self.grid_hscroll.grid()
+        else: self.grid_hscroll.grid_remove()
+        if full_h > avail_h: self.grid_vscroll.grid()
+        else: self.grid_vscroll.grid_remove()
         self._resize_job_id = None
 
+    # --- Wall Size ---
+    def apply_wall_size(self):
+        panels_w, panels_h = int(self.wall_cols.get()), int(self.wall_rows.get())
+        if panels_w * panels_h > MAX_WALL_PANELS:
+            self.log(f"A {panels_w}x{panels_h} wall needs {panels_w * panels_h} Locations; the EEPROM has {MAX_WALL_PANELS}.", "error")
+            return self.set_wall_vars()
+
+        rows, cols = panels_h * GRID_SIZE, panels_w * GRID_SIZE
+        if (rows, cols) == (self.grid_data.rows, self.grid_data.cols): return
+        if (rows < self.grid_data.rows or cols < self.grid_data.cols) and \
+                not messagebox.askyesno("Confirm", "The wall is getting smaller. Panels outside it will be lost. Continue?"):
+            return self.set_wall_vars()
+
+        self.begin_edit("Wall size")
+        self.set_grid_size(self.grid_data.resized(rows, cols))
+        self.end_edit()
+        self.mark_unsaved()
+
+    def composite_image_wall(self):
+        """Cuts an image into Wide x High panels (any count) and sends the distinct tiles to the encoder."""
+        fp = filedialog.askopenfilename(filetypes=image_import.IMAGE_FILETYPES)
+        if not fp: return
+        panels_w, panels_h = int(self.wall_cols.get()), int(self.wall_rows.get())
+        try:
+            with Image.open(fp) as img:
+                layout = wall_compositor.composite_image(img, panels_w, panels_h, PALETTE_RGB, self.image_dither.get(), GRID_SIZE)
+        except Exception as e:
+            return messagebox.showerror("Error", f"Could not import image: {e}")
+        self.send_wall_layout(layout, os.path.splitext(os.path.basename(fp))[0])
+
+    def composite_design_wall(self):
+        self.send_wall_layout(wall_compositor.composite_design(self.grid_data, GRID_SIZE), "Design")
+
+    def send_wall_layout(self, layout, stem):
+        """Adds one [Live] encoder file per unique tile and logs which Location each panel shows."""
+        free = encoder_core.MAX_LOCATIONS - len(self.files_to_encode)
+        if len(layout.tiles) > free:
+            return self.log(f"The {layout.panels_wide}x{layout.panels_high} wall has {len(layout.tiles)} distinct panels, "
+                            f"but only {free} Location(s) are free.", "error")
+
+        first = len(self.files_to_encode)
+        for i, tile in enumerate(layout.tiles):
+            name = f"Wall_{stem}_T{i}"
+            n = 1
+            while name in self.virtual_files or name in self.files_to_encode:
+                name = f"Wall_{stem}_T{i}_{n}"
+                n += 1
+            self.virtual_files[name] = self.get_grid_as_text(tile)
+            self.files_to_encode.append(name)
+            self.file_listbox.insert("end", f"[Live] {name}")
+        self.update_boot_options()
+        self.tabview.set("EEPROM Encoder")
+        self.log(f"Wall {layout.panels_wide}x{layout.panels_high}: {layout.panel_count} panel(s), {len(layout.tiles)} distinct tile(s) "
+                 f"sent as Locations {first}-{first + len(layout.tiles) - 1}.", "warn")
+        self.log("Panel placement (Location per panel):\n" + layout.placement_text(first), "info")
+
+    def set_wall_vars(self):
+        self.wall_cols.set(str(self.grid_data.cols // GRID_SIZE))
+        self.wall_rows.set(str(self.grid_data.rows // GRID_SIZE))
+
+    def set_grid_size(self, model):
+        """Makes `model` the current design and rebuilds the canvas if its size changed."""
+        self.clear_focus()
+        self.clear_selection()
+        resized = (model.rows, model.cols) != (self.grid_canvas.rows, self.grid_canvas.cols)
+        self.grid_data = model
+        if resized:
+            self.dirty_cells.clear()
+            self.size_preview = None # Cell addresses depend on the wall shape
+            self.grid_canvas.build(model.rows, model.cols)
+            self.enforce_square_grid()
+            self.log(f"Wall size: {model.cols}x{model.rows} cells ({model.tile_count(GRID_SIZE)} panel(s)).", "info")
+        self.set_wall_vars()
+        self.refresh_grid_ui()
+
+    def cell_address(self, r, c):
+        """(location, pixel) of a cell; each panel of the wall is one Location, numbered row-major."""
+        panels_wide = self.grid_data.cols // GRID_SIZE
+        location = (r // GRID_SIZE) * panels_wide + c // GRID_SIZE
+        return location, (r % GRID_SIZE) * GRID_SIZE + c % GRID_SIZE
+
+    # --- Undo / Redo ---
+    def begin_edit(self, label):
+        """Starts recording one undoable edit; end_edit() stores only the cells it changed."""
+        self.history.begin(self.grid_data, label)
+
+    def end_edit(self):
+        self.history.commit(self.grid_data)
+
+    def undo_edit(self):
+        if self.tabview.get() != "Pixel Designer": return
+        self.apply_history_step(self.history.undo(self.grid_data), "Undo")
+
+    def redo_edit(self):
+        if self.tabview.get() != "Pixel Designer": return
+        self.apply_history_step(self.history.redo(self.grid_data), "Redo")
+
+    def apply_history_step(self, step, verb):
+        if step is None: return self.log(f"Nothing to {verb.lower()}.", "info")
+        model, changed, label = step
+        if changed is None: # Size change: the history handed back a whole model
+            self.set_grid_size(model)
+        else:
+            for i in changed:
+                self.mark_dirty(*divmod(i, model.cols))
+        self.mark_unsaved()
+        self.log(f"{verb}: {label} ({len(self.history.undo_stack)} undo / {len(self.history.redo_stack)} redo steps).", "info")
+
     def enforce_square_grid(self, event=None):
         if self._resize_job_id:
             self.after_cancel(self._resize_job_id)
@@ -679,66 +879,22 @@ class CombinedEEPROMApp(ctk.CTk):
 
     # --- OPTIMIZATION: Compression Methods ---
     def compress_grid(self):
-        """Compresses the current grid using Run-Length Encoding (RLE)."""
-        rle_data = []
-        if not self.grid_data: return []
+        """Compresses the current grid using Run-Length Encoding (RLE): [[count, char, color], ...]."""
+        return self.grid_data.to_rle()
 
-        # Flatten the 2D grid into a 1D stream
-        flat_cells = [self.grid_data[r][c] for r in range(GRID_SIZE) for c in range(GRID_SIZE)]
-        
-        if not flat_cells: return []
-
-        current_char = flat_cells[0]['char']
-        current_color = flat_cells[0]['color']
-        count = 1
-
-        for i in range(1, len(flat_cells)):
-            cell = flat_cells[i]
-            # If this cell matches the previous one, just increase the counter
-            if cell['char'] == current_char and cell['color'] == current_color:
-                count += 1
-            else:
-                # Sequence ended, store the run: [count, char, color]
-                rle_data.append([count, current_char, current_color])
-                current_char = cell['char']
-                current_color = cell['color']
-                count = 1
-        
-        # Append the final run
-        rle_data.append([count, current_char, current_color])
-        return rle_data
-
-    def decompress_grid(self, rle_data):
-        """Decompresses RLE data back into the standard grid format."""
-        new_grid = [[{'char': ' ', 'color': 'black'} for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
-        
-        # Reconstruct the flat list
-        flat_cells = []
-        for run in rle_data:
-            count, char, color = run
-            for _ in range(count):
-                flat_cells.append({'char': char, 'color': color})
-        
-        # Fill the 2D grid safely
-        idx = 0
-        total_cells = GRID_SIZE * GRID_SIZE
-        for r in range(GRID_SIZE):
-            for c in range(GRID_SIZE):
-                if idx < len(flat_cells):
-                    new_grid[r][c] = flat_cells[idx]
-                    idx += 1
-        
-        return new_grid
+    def decompress_grid(self, rle_data, rows=GRID_SIZE, cols=GRID_SIZE):
+        """Decompresses RLE data back into a grid model."""
+        return grid_model.GridModel.from_rle(rle_data, rows, cols)
 
     def update_cell_info(self, row, col):
         # Assuming you have a design_grid_data structure holding the raw color values (0-7, or hex/name)
         # Assuming your UI_COLORS dictionary maps names to hex, and you have a reverse map to binary.
         
-        # Calculate Address: 4-bit Location (0) + 8-bit Pixel (r*N + c)
-        pixel_address = (row * GRID_SIZE) + col 
+        # Calculate Address: 4-bit Location (the cell's panel) + 8-bit Pixel (r*N + c within the panel)
+        location, pixel_address = self.cell_address(row, col)
         
-        # The 16-bit EEPROM address (Location 0, Pixel X)
-        eeprom_address = pixel_address # Simplification: Assuming Location 0
+        # The 16-bit EEPROM address
+        eeprom_address = (location << 8) | pixel_address
         
         # Fetch the data stored in the pixel (You must implement how data is stored, e.g., self.pixel_data[row][col])
         # Example data structure: (RGB1_Value, RGB2_Value, Character_Value)
@@ -750,7 +906,7 @@ class CombinedEEPROMApp(ctk.CTk):
         
         # For demonstration, use address and row/col info:
         info_text = (
-            f"Address: 0x00{eeprom_address:02X} (L0:P{pixel_address})\n"
+            f"Address: 0x{eeprom_address:04X} (L{location}:P{pixel_address})\n"
             f"Pixel: ({row}, {col})\n"
             f"DEC Value: 0\n" # Replace 0 with the actual DEC value
             f"BIN Value: 000 000 000 0000000" # Replace with actual 16-bit binary
@@ -769,7 +925,8 @@ class CombinedEEPROMApp(ctk.CTk):
     def sync_tools(self):
         self.current_tool = self.tool_var.get()
         self.clear_focus()
-        self.clear_selection()
+        if self.current_tool != "fill": # Fill stays inside the selection, so it keeps it
+            self.clear_selection()
 
     def select_color(self, color):
         self.selected_color = color
@@ -777,8 +934,9 @@ class CombinedEEPROMApp(ctk.CTk):
         self.tool_var.set("paint")
         self.sync_tools()
 
-    def on_cell_down(self, event, r, c):
+    def on_cell_down(self, r, c):
         if self.current_tool == "paint": 
+            self.begin_edit("Paint") # The whole stroke is one undo step, committed on release
             self.paint_cell(r, c)
         elif self.current_tool == "text": 
             self.set_text_focus(r, c)
@@ -788,92 +946,99 @@ class CombinedEEPROMApp(ctk.CTk):
                 self.log(f"Line Start: ({r}, {c}). Select end point.", "info")
             else:
                 r1, c1 = self.focused_cell
+                self.begin_edit("Line")
                 self.draw_line_bresenham(r1, c1, r, c, self.selected_color)
+                self.end_edit()
                 self.clear_focus()
                 self.log(f"Drew line from ({r1}, {c1}) to ({r}, {c}).", "warn")
         elif self.current_tool == "fill":
-            self.flood_fill(r, c, self.grid_data[r][c]['color'], self.selected_color)
+            self.begin_edit("Fill")
+            self.flood_fill(r, c, self.selected_color)
+            self.end_edit()
             self.log(f"Filled area starting at ({r}, {c}) with {self.selected_color}.", "warn")
         elif self.current_tool == "select":
+            self.clear_selection() # Clears selection_start too, so it is set afterwards
             self.selection_start = (r, c)
-            self.clear_selection()
             self.update_selection_box(r, c)
             
-    def on_cell_drag(self, event):
-        x, y = event.x_root, event.y_root
-        target = self.winfo_containing(x, y)
-        if target in self.cells:
-            r, c = self.cells[target]
-            
-            # Live Preview
-            addr = r * GRID_SIZE + c
-            cell = self.grid_data[r][c]
-            char_bin = self.binary_chars.get(cell['char'], "0000000").rjust(7, "0")
-            color_bin = COLOR_MAP[cell['color']]
-            # Use the is_16bit setting for the preview's leading bits
-            leading_bits = "111" if self.is_16bit.get() else "000"
-            full_bin = leading_bits + color_bin + char_bin
-            
-            self.lbl_cell_info.configure(text=f"Addr: {addr} (R{r}, C{c})\nBIN: {full_bin}\nDEC: {int(full_bin, 2)}")
+    def on_cell_drag(self, r, c):
+        # Live Preview (throttled; the canvas already reports each cell only once)
+        self.schedule_cell_preview(r, c)
+        
+        if self.current_tool == "paint":
+            self.paint_cell(r, c)
+        elif self.current_tool == "select" and self.selection_start:
+            self.update_selection_box(r, c)
             
-            if self.current_tool == "paint":
-                self.paint_cell(r, c)
-            elif self.current_tool == "select" and self.selection_start:
-                self.update_selection_box(r, c)
-                
-    def on_cell_up(self, event):
+    def on_cell_up(self, r, c):
+        self.end_edit()
         if self.current_tool == "select" and self.selection_start:
-            x, y = event.x_root, event.y_root
-            target = self.winfo_containing(x, y)
-            if target in self.cells:
-                self.selection_end = self.cells[target]
-                self.update_selection_box(self.selection_end[0], self.selection_end[1], final=True)
+            self.selection_end = (r, c)
+            self.update_selection_box(r, c, final=True)
 
     def paint_cell(self, r, c, color=None):
         color = color if color else self.selected_color
-        self.grid_data[r][c]['color'] = color
+        if self.grid_data.color(r, c) == color: return # Repainting a cell changes nothing
+        self.grid_data.set_color(r, c, color)
         self.mark_unsaved()
         
-        # Update UI
-        fg = "black" if color in ["white", "yellow", "cyan", "bright_green", "bright_red", "bright_blue"] else "white"
-        for widget, coords in self.cells.items():
-            if coords == (r, c):
-                widget.config(bg=UI_COLORS[color], fg=fg)
-                self.update_selection_highlight(widget, (r, c)) 
-                break
+        self.mark_dirty(r, c)
+
+    # --- Dirty-Cell Redraw ---
+    def mark_dirty(self, r, c):
+        """Queues one cell for the next redraw; all changes in one event are drawn together."""
+        self.dirty_cells.add((r, c))
+        if self.redraw_job is None:
+            self.redraw_job = self.after_idle(self.flush_dirty_cells)
+
+    def mark_area_dirty(self, min_r, min_c, max_r, max_c):
+        for r in range(max(min_r, 0), min(max_r, self.grid_data.rows - 1) + 1):
+            for c in range(max(min_c, 0), min(max_c, self.grid_data.cols - 1) + 1):
+                self.mark_dirty(r, c)
+
+    def flush_dirty_cells(self):
+        self.redraw_job = None
+        dirty, self.dirty_cells = self.dirty_cells, set()
+        preview = self.get_size_preview()
+        table = self.get_word_table()
+        for r, c in dirty:
+            self.draw_cell(r, c)
+            preview.set_word(self.grid_data.index(r, c), table.cell_word(self.grid_data, r, c)) # O(1) size update
+        self.update_size_label()
+
+        # Drags flush every frame, so the counts are summed and logged on a timer
+        stats = self.redraw_stats
+        stats[0] += 1
+        stats[1] += len(dirty)
+        stats[2] = max(stats[2], len(dirty))
+        if self.redraw_log_job is None:
+            self.redraw_log_job = self.after(REDRAW_LOG_MS, self.log_redraw_stats)
+
+    def log_redraw_stats(self):
+        self.redraw_log_job = None
+        flushes, cells, largest = self.redraw_stats
+        self.redraw_stats = [0, 0, 0]
+        if flushes:
+            self.log(f"Redrew {cells} cell(s) in {flushes} flush(es), up to {largest} per flush.", "info")
+
+    def draw_cell(self, r, c):
+        """Redraws one cell on the grid canvas from grid_data."""
+        color = self.grid_data.color(r, c)
+        self.grid_canvas.draw_cell(r, c, UI_COLORS[color], "black" if color in LIGHT_COLORS else "white", self.grid_data.char(r, c))
     
     def cursor_blink(self):
         """Manages the visual flashing of the cursor on the focused cell."""
         if not self.focused_cell:
             return
-            
-        r, c = self.focused_cell
-        focused_widget = None
-        for widget, coords in self.cells.items():
-            if coords == (r, c):
-                focused_widget = widget
-                break
 
-        if focused_widget:
-            # Get the current background color to 'hide' the cursor
-            current_bg = self.grid_data[r][c]['color']
-
-            if self.cursor_state == "on":
-                # Cursor 'off' state: Use the cell's background color to hide the highlight
-                focused_widget.config(
-                    highlightbackground=UI_COLORS["black"],
-                    highlightcolor=UI_COLORS["black"], 
-                    highlightthickness=self.cursor_width
-                )
-                self.cursor_state = "off"
-            else:
-                # Cursor 'on' state: Show the white cursor border
-                focused_widget.config(
-                    highlightbackground=self.cursor_color_on, 
-                    highlightcolor=self.cursor_color_on, 
-                    highlightthickness=self.cursor_width
-                )
-                self.cursor_state = "on"
+        if self.cursor_state == "on":
+            # Cursor 'off' state: blend the border into the grid background
+            self.grid_canvas.set_cursor_color(UI_COLORS["black"])
+            self.cursor_state = "off"
+        else:
+            # Cursor 'on' state: Show the white cursor border
+            self.grid_canvas.set_cursor_color(self.cursor_color_on)
+            self.cursor_state = "on"
 
         # Schedule the next blink (500ms is a standard rate)
         self.cursor_flash_timer = self.after(500, self.cursor_blink)
@@ -884,36 +1049,74 @@ class CombinedEEPROMApp(ctk.CTk):
         self.clear_focus()
         self.focused_cell = (r, c)
     
-        # 2. Find the widget and apply initial focus visual (ON state)
-        focused_widget = None
-        for widget, coords in self.cells.items():
-            if coords == (r, c):
-                focused_widget = widget
-                break
-
-        if focused_widget:
-            # Set the widget to the initial 'ON' state for the flashing cursor
-            focused_widget.config(
-                highlightbackground=self.cursor_color_on, 
-                highlightcolor=self.cursor_color_on, 
-                highlightthickness=self.cursor_width, 
-                relief="flat" # Ensure it is flat so the highlight takes precedence
-            )
+        # 2. Show the cursor border in its initial 'ON' state
+        self.grid_canvas.show_cursor(r, c, self.cursor_color_on, self.cursor_width)
 
         # 3. Start the blinking timer
         self.cursor_state = "on"
         self.cursor_flash_timer = self.after(500, self.cursor_blink)
     
-        # Use the logic you provided:
-        if focused_widget:
-            addr = r * GRID_SIZE + c
-            cell = self.grid_data[r][c]
-            # Ensure you handle potentially missing keys in binary_chars safely
-            char_bin = self.binary_chars.get(cell['char'], "0000000").rjust(7, "0") 
-            color_bin = COLOR_MAP[cell['color']] # Assuming COLOR_MAP is defined
-            leading_bits = "111" if self.is_16bit.get() else "000"
-            full_bin = leading_bits + color_bin + char_bin
-            self.lbl_cell_info.configure(text=f"Addr: {addr} (R{r}, C{c})\nBIN: {full_bin}\nDEC: {int(full_bin, 2)}")
+        self.show_cell_preview(r, c)
+
+    def show_cell_preview(self, r, c):
+        """Shows the cell's Location/pixel address and its encoded word."""
+        location, addr = self.cell_address(r, c)
+        table = self.get_word_table()
+        self.lbl_cell_info.configure(text=f"Addr: L{location}:{addr} (R{r}, C{c})\nBIN: {table.cell_text(self.grid_data, r, c)}\nDEC: {table.cell_word(self.grid_data, r, c)}")
+
+    # --- Word Table ---
+    def get_word_table(self):
+        """Words for every (color, char) pair under the current charmap and 16/8-bit mode."""
+        if self.word_table is None:
+            self.word_table = word_table.WordTable(self.binary_chars, COLOR_MAP, self.is_16bit.get())
+        return self.word_table
+
+    def invalidate_word_table(self):
+        """Call after binary_chars is replaced; 16/8-bit changes call it through a variable trace."""
+        self.word_table = None
+        self.invalidate_size_preview()
+
+    # --- Live Encoded Size ---
+    def get_size_preview(self):
+        """Encoded size of the design under the current mode, charmap and sparse setting (rebuilt only when those change)."""
+        model = self.grid_data
+        if self.size_preview is None:
+            self.size_preview = encode_preview.EncodedSizePreview(
+                self.get_word_table().model_words(model), encode_preview.design_addresses(model.rows, model.cols, GRID_SIZE),
+                model.tile_count(GRID_SIZE), self.is_16bit.get(), self.preview_skip_value())
+        return self.size_preview
+
+    def preview_skip_value(self):
+        """The encoder's sparse fill word, or None when sparse output is off (or not set up yet / invalid)."""
+        if not hasattr(self, "sparse_output") or not self.sparse_output.get(): return None
+        try:
+            return encoder_core.calc_val(self.sparse_fill.get().strip() or "0", self.binary_chars)
+        except Exception:
+            return None
+
+    def invalidate_size_preview(self):
+        self.size_preview = None
+        if hasattr(self, "lbl_encoded_size"):
+            self.update_size_label()
+
+    def update_size_label(self):
+        preview = self.get_size_preview()
+        total = encoder_core.TOTAL_ADDRESSES
+        sparse = " (sparse)" if preview.skip_value is not None else ""
+        self.lbl_encoded_size.configure(
+            text=f"Encoded: {preview.total_chars:,} chars{sparse}\n"
+                 f"Used: {preview.used} / {total} addresses ({preview.used / total * 100:.1f}%)")
+
+    def schedule_cell_preview(self, r, c):
+        """Updates the preview at most every PREVIEW_MS during a drag; the last cell is always shown."""
+        self.preview_cell = (r, c)
+        if self.preview_job is None:
+            self.preview_job = self.after(PREVIEW_MS, self.flush_cell_preview)
+
+    def flush_cell_preview(self):
+        self.preview_job = None
+        if self.preview_cell and self.grid_data.in_bounds(*self.preview_cell):
+            self.show_cell_preview(*self.preview_cell)
 
     def clear_focus(self):
         """Clears focus from the currently selected cell, stops blinking, and resets visual state."""
@@ -924,80 +1127,39 @@ class CombinedEEPROMApp(ctk.CTk):
             self.cursor_flash_timer = None
 
         if self.focused_cell:
-            r, c = self.focused_cell
-            
-            # Find the widget and reset its appearance
-            for widget, coords in self.cells.items():
-                if coords == (r, c):
-                    # Reset the border and remove the highlight box
-                    widget.config(
-                        highlightbackground=UI_COLORS["black"],
-                        highlightcolor=UI_COLORS["black"],
-                        highlightthickness=self.cursor_width
-                    )
-                    break
-            
+            self.grid_canvas.hide_cursor()
             self.focused_cell = None
 
         self.lbl_cell_info.configure(text="Addr: --\nBIN: --\nDEC: --")
 
     def clear_selection(self):
-        if self.selection_area:
-            r1, c1, r2, c2 = self.selection_area
-            min_r, max_r = min(r1, r2), max(r1, r2)
-            min_c, max_c = min(c1, c2), max(c1, c2)
-            
-            for r in range(min_r, max_r + 1):
-                for c in range(min_c, max_c + 1):
-                    for widget, coords in self.cells.items():
-                        if coords == (r, c):
-                            if self.focused_cell == (r, c):
-                                widget.config(relief="solid", bd=2)
-                            else:
-                                widget.config(relief="flat", bd=1)
-                            break
+        if self.selection_area or self.selection_start:
+            self.grid_canvas.hide_selection()
                             
         self.selection_start = None
         self.selection_end = None
         self.selection_area = None
 
+    def deselect(self):
+        """Drops the selection (Esc), so transforms and fills apply to the whole grid again."""
+        if self.tabview.get() != "Pixel Designer" or not self.selection_area: return
+        self.clear_selection()
+        self.log("Selection cleared: transforms apply to the whole grid.", "info")
+
     def update_selection_box(self, r_current, c_current, final=False):
         if not self.selection_start: return
         r1, c1 = self.selection_start
         r2, c2 = r_current, c_current
         
-        self.clear_selection()
-        
         min_r, max_r = min(r1, r2), max(r1, r2)
         min_c, max_c = min(c1, c2), max(c1, c2)
         
-        # Highlight new selection
-        for r in range(min_r, max_r + 1):
-            for c in range(min_c, max_c + 1):
-                for widget, coords in self.cells.items():
-                    if coords == (r, c):
-                        if (r, c) != self.focused_cell: 
-                            widget.config(relief="solid", bd=2, highlightthickness=0, highlightbackground=THEME["accent"])
-                        break
+        # Highlight new selection (one outline around the whole box)
+        self.grid_canvas.show_selection(r1, c1, r2, c2, THEME["accent"])
 
         if final:
             self.selection_area = (r1, c1, r2, c2)
-            self.log(f"Selection made: R{min_r}-R{max_r}, C{min_c}-C{max_c}", "info")
-    
-    def update_selection_highlight(self, widget, coords):
-        if self.selection_area and coords != self.focused_cell:
-            r, c = coords
-            r1, c1, r2, c2 = self.selection_area
-            min_r, max_r = min(r1, r2), max(r1, r2)
-            min_c, max_c = min(c1, c2), max(c1, c2)
-            
-            if min_r <= r <= max_r and min_c <= c <= max_c:
-                widget.config(relief="solid", bd=2)
-            else:
-                widget.config(relief="flat", bd=1)
-        elif coords != self.focused_cell:
-            widget.config(relief="flat", bd=1)
-
+            self.log(f"Selection made: R{min_r}-R{max_r}, C{min_c}-C{max_c} (transforms now apply to it; Esc to deselect)", "info")
 
     def handle_keypress(self, event):
         # 1. Scope Check: Only run if in Designer tab
@@ -1011,22 +1173,23 @@ class CombinedEEPROMApp(ctk.CTk):
 
         r, c = self.focused_cell
         sym = event.keysym
+        rows, cols = self.grid_data.rows, self.grid_data.cols
 
         # --- NAVIGATION LOGIC (Stays the same) ---
         if sym == "Up":
-            self.set_text_focus((r - 1) % GRID_SIZE, c)
+            self.set_text_focus((r - 1) % rows, c)
             return
         elif sym == "Down":
-            self.set_text_focus((r + 1) % GRID_SIZE, c)
+            self.set_text_focus((r + 1) % rows, c)
             return
         elif sym == "Left":
-            self.set_text_focus(r, (c - 1) % GRID_SIZE)
+            self.set_text_focus(r, (c - 1) % cols)
             return
         elif sym == "Right":
-            self.set_text_focus(r, (c + 1) % GRID_SIZE)
+            self.set_text_focus(r, (c + 1) % cols)
             return
         elif sym == "Return":
-            self.set_text_focus((r + 1) % GRID_SIZE, 0)
+            self.set_text_focus((r + 1) % rows, 0)
             return
 
         # --- TYPING LOGIC (Only if Text Tool is active) ---
@@ -1044,18 +1207,17 @@ class CombinedEEPROMApp(ctk.CTk):
             prev_c -= 1
 
             if prev_c < 0: # Wrap to previous line end
-                prev_c = GRID_SIZE - 1
-                prev_r = (prev_r - 1 + GRID_SIZE) % GRID_SIZE 
+                prev_c = cols - 1
+                prev_r = (prev_r - 1 + rows) % rows 
 
             # 3. Clear the character at the new cursor location (where the cursor moves to)
-            self.grid_data[prev_r][prev_c]['char'] = " "
+            self.begin_edit("Backspace")
+            self.grid_data.set_char(prev_r, prev_c, " ")
+            self.end_edit()
             self.mark_unsaved()
 
-            # Update the UI widget at the new location
-            for widget, coords in self.cells.items():
-                if coords == (prev_r, prev_c):
-                    widget.config(text=" ")
-                    break
+            # Update the UI at the new location
+            self.mark_dirty(prev_r, prev_c)
                     
             # 4. Move the focus (cursor) to the new position (prev_r, prev_c)
             self.set_text_focus(prev_r, prev_c)
@@ -1068,19 +1230,18 @@ class CombinedEEPROMApp(ctk.CTk):
         if len(key) == 1 and (key in self.binary_chars or key == " "):
             
             # 1. Update Data & UI at current location (r, c)
-            self.grid_data[r][c]['char'] = key
+            self.begin_edit("Type")
+            self.grid_data.set_char(r, c, key)
+            self.end_edit()
             self.mark_unsaved()
-            for widget, coords in self.cells.items():
-                if coords == (r, c):
-                    widget.config(text=key)
-                    break
+            self.mark_dirty(r, c)
                     
             # 2. Calculate and set focus to the next cell
             next_c, next_r = c, r
             next_c += 1
-            if next_c >= GRID_SIZE: # Wrap to next line start
+            if next_c >= cols: # Wrap to next line start
                 next_c = 0
-                next_r = (next_r + 1) % GRID_SIZE
+                next_r = (next_r + 1) % rows
 
             self.set_text_focus(next_r, next_c)
 
@@ -1088,123 +1249,81 @@ class CombinedEEPROMApp(ctk.CTk):
     def clear_grid(self, confirm=True):
         if confirm and not messagebox.askyesno("Confirm", "Clear entire grid?"): return
         
-        for r in range(GRID_SIZE):
-            for c in range(GRID_SIZE):
-                self.grid_data[r][c] = {'char': ' ', 'color': 'black'}
-        
+        self.begin_edit("Clear grid")
+        self.grid_data.clear()
+        self.end_edit()
         self.refresh_grid_ui()
         self.clear_focus()
         self.clear_selection()
         self.mark_unsaved()
 
     # --- FEATURE: Flood Fill ---
-    def flood_fill(self, r, c, target_color, fill_color):
-        if target_color == fill_color or r < 0 or r >= GRID_SIZE or c < 0 or c >= GRID_SIZE:
-            return
-        if self.grid_data[r][c]['color'] != target_color:
-            return
+    def flood_fill(self, r, c, fill_color):
+        """Scanline fill on the model (stays inside the selection, if any), then one redraw of the filled box."""
+        if not self.grid_data.in_bounds(r, c): return
+        bounds = None
+        if self.selection_area:
+            r1, c1, r2, c2 = self.selection_area
+            bounds = (min(r1, r2), min(c1, c2), max(r1, r2), max(c1, c2))
 
-        stack = [(r, c)]
-        while stack:
-            curr_r, curr_c = stack.pop()
-            
-            if curr_r < 0 or curr_r >= GRID_SIZE or curr_c < 0 or curr_c >= GRID_SIZE:
-                continue
-            if self.grid_data[curr_r][curr_c]['color'] != target_color:
-                continue
-            
-            self.paint_cell(curr_r, curr_c, fill_color)
+        box = self.grid_data.fill(r, c, fill_color, self.fill_match_colors(r, c), self.fill_match_char.get(), bounds)
+        if box:
+            self.mark_area_dirty(*box)
+            self.mark_unsaved()
 
-            # Check neighbors
-            stack.append((curr_r + 1, curr_c))
-            stack.append((curr_r - 1, curr_c))
-            stack.append((curr_r, curr_c + 1))
-            stack.append((curr_r, curr_c - 1))
+    def fill_match_colors(self, r, c):
+        """Palette indexes within the fill tolerance of the cell's color (None for an exact match)."""
+        tolerance = self.fill_tolerance.get()
+        if not tolerance: return None
+        limit = MAX_RGB_DISTANCE * tolerance / 100
+        seed = PALETTE_RGB[self.grid_data.colors[self.grid_data.index(r, c)]]
+        return [i for i, rgb in enumerate(PALETTE_RGB)
+                if sum((a - b) ** 2 for a, b in zip(rgb, seed)) ** 0.5 <= limit]
 
     # --- FEATURE: Line Tool (Bresenham's) ---
     def draw_line_bresenham(self, r1, c1, r2, c2, color):
-        dr = abs(r2 - r1)
-        dc = abs(c2 - c1)
-        sr = 1 if r1 < r2 else -1
-        sc = 1 if c1 < c2 else -1
-        err = dr - dc
-
-        curr_r, curr_c = r1, c1
-        while True:
-            self.paint_cell(curr_r, curr_c, color)
-            if curr_r == r2 and curr_c == c2: break
-            
-            e2 = 2 * err
-            if e2 > -dc:
-                err -= dc
-                curr_r += sr
-            if e2 < dr:
-                err += dr
-                curr_c += sc
+        for r, c in grid_canvas.line_cells(r1, c1, r2, c2):
+            self.paint_cell(r, c, color)
 
     # --- FEATURE: Grid Transformations (Mirror/Flip/Rotate) ---
-    def transform_grid(self, action):
-        new_grid = [[None for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
-        
-        if not messagebox.askyesno("Confirm", f"Apply '{action.replace('_', ' ').title()}' to the entire grid?"): return
-
-        for r in range(GRID_SIZE):
-            for c in range(GRID_SIZE):
-                cell = self.grid_data[r][c]
-                
-                if action == 'flip_h':
-                    new_grid[r][GRID_SIZE - 1 - c] = cell
-                elif action == 'flip_v':
-                    new_grid[GRID_SIZE - 1 - r][c] = cell
-                elif action == 'rotate':
-                    # Transpose (c, r) then flip horizontal (for 90 degree clockwise rotation)
-                    new_grid[c][GRID_SIZE - 1 - r] = cell 
-
-        self.grid_data = new_grid
-        self.refresh_grid_ui()
-        self.log(f"Grid transformed: {action}", "warn")
-        self.clear_focus()
-        self.clear_selection()
+    def transform_grid(self, action, dr=0, dc=0):
+        """Applies a grid_model transform to the selection, or to the whole grid when nothing is selected."""
+        # No confirmation: a transform is one undo step
+        label = TRANSFORM_LABELS[action]
+        if self.selection_area:
+            r1, c1, r2, c2 = self.selection_area
+            box = (min(r1, r2), min(c1, c2), max(r1, r2), max(c1, c2))
+            self.begin_edit(f"{label} selection")
+            try:
+                self.grid_data.transform_region(action, *box, dr, dc)
+            except ValueError as e:
+                self.end_edit()
+                return self.log(str(e), "error")
+            self.end_edit()
+            self.mark_area_dirty(*box)
+            self.log(f"Selection transformed: {label}", "warn")
+        else:
+            self.begin_edit(label)
+            self.set_grid_size(self.grid_data.transformed(action, dr, dc)) # Rotating a wall swaps its width and height
+            self.end_edit()
+            self.log(f"Grid transformed: {label}", "warn")
         self.mark_unsaved()
 
     def refresh_grid_ui(self):
-        for r in range(GRID_SIZE):
-            for c in range(GRID_SIZE):
-                cell = self.grid_data[r][c]
-                color = cell['color']
-                char = cell['char']
-                fg = "black" if color in ["white", "yellow", "cyan", "bright_green", "bright_red", "bright_blue"] else "white"
-                
-                for w, coords in self.cells.items():
-                    if coords == (r, c):
-                        w.config(text=char, bg=UI_COLORS[color], fg=fg)
-                        # Ensure selection/focus highlights are also reapplied after refresh
-                        if self.focused_cell == (r, c):
-                             w.config(relief="solid", bd=2)
-                        else:
-                            self.update_selection_highlight(w, coords)
-                        break
+        # Cursor and selection are canvas overlays, so only the cells need redrawing
+        self.mark_area_dirty(0, 0, self.grid_data.rows - 1, self.grid_data.cols - 1)
     
     # --- FEATURE: Selection & Clipboard ---
     def get_selection_data(self):
+        """The selected box as a GridModel copy, or None."""
         if not self.selection_area: return None
         r1, c1, r2, c2 = self.selection_area
-        min_r, max_r = min(r1, r2), max(r1, r2)
-        min_c, max_c = min(c1, c2), max(c1, c2)
-        
-        data = []
-        for r in range(min_r, max_r + 1):
-            row_data = []
-            for c in range(min_c, max_c + 1):
-                row_data.append(self.grid_data[r][c].copy())
-            data.append(row_data)
-        
-        return data
+        return self.grid_data.region(min(r1, r2), min(c1, c2), max(r1, r2), max(c1, c2))
 
     def copy_selection(self):
         self.selection_clipboard = self.get_selection_data()
         if self.selection_clipboard:
-            self.log(f"Copied selection of size {len(self.selection_clipboard)}x{len(self.selection_clipboard[0])}", "warn")
+            self.log(f"Copied selection of size {self.selection_clipboard.rows}x{self.selection_clipboard.cols}", "warn")
         else:
             self.log("No selection to copy.", "error")
             
@@ -1217,11 +1336,10 @@ class CombinedEEPROMApp(ctk.CTk):
         min_c, max_c = min(c1, c2), max(c1, c2)
         
         # Clear the cut area
-        for r in range(min_r, max_r + 1):
-            for c in range(min_c, max_c + 1):
-                self.grid_data[r][c] = {'char': ' ', 'color': 'black'}
-                
-        self.refresh_grid_ui()
+        self.begin_edit("Cut")
+        self.grid_data.clear_region(min_r, min_c, max_r, max_c)
+        self.end_edit()
+        self.mark_area_dirty(min_r, min_c, max_r, max_c)
         self.clear_selection()
         self.log("Cut selection and cleared area.", "warn")
 
@@ -1230,22 +1348,18 @@ class CombinedEEPROMApp(ctk.CTk):
         if not self.focused_cell: return self.log("Select the top-left paste anchor.", "error")
         
         r_anchor, c_anchor = self.focused_cell
-        rows = len(self.selection_clipboard)
-        cols = len(self.selection_clipboard[0])
+        rows = self.selection_clipboard.rows
+        cols = self.selection_clipboard.cols
         
         # Check bounds
-        if r_anchor + rows > GRID_SIZE or c_anchor + cols > GRID_SIZE:
+        if r_anchor + rows > self.grid_data.rows or c_anchor + cols > self.grid_data.cols:
             return self.log("Paste area exceeds grid boundaries.", "error")
         
         # Paste data
-        for r_offset in range(rows):
-            for c_offset in range(cols):
-                new_r = r_anchor + r_offset
-                new_c = c_anchor + c_offset
-                
-                self.grid_data[new_r][new_c] = self.selection_clipboard[r_offset][c_offset].copy()
-                self.paint_cell(new_r, new_c, self.grid_data[new_r][new_c]['color']) 
-                self.refresh_grid_ui()
+        self.begin_edit("Paste")
+        self.grid_data.paste(self.selection_clipboard, r_anchor, c_anchor)
+        self.end_edit()
+        self.mark_area_dirty(r_anchor, c_anchor, r_anchor + rows - 1, c_anchor + cols - 1)
                 
         self.log(f"Pasted selection at R{r_anchor}, C{c_anchor}.", "warn")
         self.mark_unsaved()
@@ -1260,71 +1374,73 @@ class CombinedEEPROMApp(ctk.CTk):
         data = self.get_selection_data()
         
         # Clear the old selection area
-        for r in range(min_r, max_r + 1):
-            for c in range(min_c, max_c + 1):
-                self.grid_data[r][c] = {'char': ' ', 'color': 'black'}
+        self.begin_edit("Shift")
+        self.grid_data.clear_region(min_r, min_c, max_r, max_c)
 
         # Calculate new area bounds
         new_min_r, new_max_r = min_r + dr, max_r + dr
         new_min_c, new_max_c = min_c + dc, max_c + dc
 
-        rows = len(data)
-        cols = len(data[0])
-        
-        for r_offset in range(rows):
-            for c_offset in range(cols):
-                new_r = min_r + dr + r_offset
-                new_c = min_c + dc + c_offset
-                
-                if 0 <= new_r < GRID_SIZE and 0 <= new_c < GRID_SIZE:
-                    self.grid_data[new_r][new_c] = data[r_offset][c_offset].copy()
+        # Cells shifted past the edge are dropped
+        self.grid_data.paste(data, new_min_r, new_min_c)
+        self.end_edit()
 
-        # Update the UI and selection area
+        # Update the UI and selection area (one region covering the old and new boxes)
         self.selection_area = (new_min_r, new_min_c, new_max_r, new_max_c)
-        self.refresh_grid_ui()
+        self.mark_area_dirty(min(min_r, new_min_r), min(min_c, new_min_c), max(max_r, new_max_r), max(max_c, new_max_c))
+        self.mark_unsaved()
         self.update_selection_box(r2 + dr, c2 + dc, final=True)
         self.log(f"Shifted selection by ({dr}, {dc}).", "warn")
         
 
-    def get_grid_as_text(self):
-        lines = []
-        for r in range(GRID_SIZE):
-            for c in range(GRID_SIZE):
-                cell = self.grid_data[r][c]
-                char_bin = self.binary_chars.get(cell['char'], "0000000").rjust(7, "0")
-                color_bin = COLOR_MAP[cell['color']]
-                
-                # Check 16-bit setting to determine leading bits
-                leading_bits = "111" if self.is_16bit.get() else "000"
-                lines.append(leading_bits + color_bin + char_bin)
+    def get_grid_as_text(self, panel=None):
+        """Encoder source text for one 16x16 panel (default: the whole grid when it is a single panel)."""
+        panel = panel or self.grid_data
+        lines = self.get_word_table().model_texts(panel) # 16/8-bit leading bits are part of the table
         
         while len(lines) < GRID_SIZE * GRID_SIZE:
             lines.append("0000000000000") # 13 bits total
             
         return "\n".join(lines)
 
+    def wall_names(self, base):
+        """Virtual file name per panel: `base` for a single panel, `base_P0`, `base_P1`... for a wall."""
+        count = self.grid_data.tile_count(GRID_SIZE)
+        return [base] if count == 1 else [f"{base}_P{i}" for i in range(count)]
+
     def send_to_encoder(self):
-        content = self.get_grid_as_text()
-        v_name = f"Virtual_Design_{len(self.virtual_files) + 1}"
+        # A wall is sent as one virtual file per panel, in Location order
+        panels = self.grid_data.tiles(GRID_SIZE)
+        names = self.wall_names(f"Virtual_Design_{len(self.virtual_files) + 1}")
         # Ensure unique name
         i = 1
-        while v_name in self.virtual_files or v_name in self.files_to_encode:
-            v_name = f"Virtual_Design_{i}"
+        while any(n in self.virtual_files or n in self.files_to_encode for n in names):
+            names = self.wall_names(f"Virtual_Design_{i}")
             i += 1
             
-        self.virtual_files[v_name] = content
-        self.files_to_encode.append(v_name)
-        self.file_listbox.insert("end", f"[Live] {v_name}")
+        for v_name, panel in zip(names, panels):
+            self.virtual_files[v_name] = self.get_grid_as_text(panel)
+            self.files_to_encode.append(v_name)
+            self.file_listbox.insert("end", f"[Live] {v_name}")
         self.update_boot_options()
         self.tabview.set("EEPROM Encoder")
-        self.log(f"Sent current design to encoder as {v_name}", "warn")
+        self.log(f"Sent current design to encoder as {', '.join(names)}", "warn")
+        if len(self.files_to_encode) > encoder_core.MAX_LOCATIONS:
+            self.log(f"The encoder list now has {len(self.files_to_encode)} files; only {encoder_core.MAX_LOCATIONS} fit in the EEPROM.", "warn")
 
     def export_designer_file(self):
         fp = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[("Text Files", "*.txt")])
         if fp:
             try:
-                with open(fp, "w", encoding="utf-8") as f: f.write(self.get_grid_as_text())
-                messagebox.showinfo("Exported", "File saved successfully.")
+                panels = self.grid_data.tiles(GRID_SIZE)
+                if len(panels) == 1:
+                    with open(fp, "w", encoding="utf-8") as f: f.write(self.get_grid_as_text())
+                else:
+                    # Walls export one file per panel: name_P0.txt, name_P1.txt... (Location order)
+                    stem, ext = os.path.splitext(fp)
+                    for i, panel in enumerate(panels):
+                        with open(f"{stem}_P{i}{ext}", "w", encoding="utf-8") as f: f.write(self.get_grid_as_text(panel))
+                messagebox.showinfo("Exported", f"{len(panels)} file(s) saved successfully.")
             except Exception as e:
                 messagebox.showerror("Error", f"Could not save file: {e}")
 
@@ -1334,39 +1450,189 @@ class CombinedEEPROMApp(ctk.CTk):
         try:
             with open(fp, "r", encoding="utf-8") as f:
                 lines = [l.rstrip("\n") for l in f if l.strip()]
-            if len(lines) < GRID_SIZE * GRID_SIZE:
-                raise ValueError(f"File must contain at least {GRID_SIZE*GRID_SIZE} lines.")
-        
-            for r in range(GRID_SIZE):
-                for c in range(GRID_SIZE):
-                    idx = r * GRID_SIZE + c
-                    line = lines[idx].ljust(13, "0")
-
-                    # Note: We rely on the stored char map to correctly decode the character bits
-                    color_bin = line[3:9].rjust(6, "0")
-                    char_bin = line[9:16].rjust(7, "0")
-                    color = REVERSE_COLOR_MAP.get(color_bin, "black")
-                    char = self.reverse_char_map.get(char_bin, " ")
-
-                    self.grid_data[r][c] = {'char': char, 'color': color}
-
+            panel_lines = GRID_SIZE * GRID_SIZE
+            if len(lines) < panel_lines:
+                raise ValueError(f"File must contain at least {panel_lines} lines.")
+
+            # Every further 256 lines fill the next panel of a wall
+            panels = min(len(lines) // panel_lines, self.grid_data.tile_count(GRID_SIZE))
+            self.begin_edit("Import")
+            for idx in range(panels * panel_lines):
+                panel, pixel = divmod(idx, panel_lines)
+                top, left = self.grid_data.tile_origin(panel, GRID_SIZE)
+                r, c = top + pixel // GRID_SIZE, left + pixel % GRID_SIZE
+                line = lines[idx].ljust(13, "0")
+
+                # Note: We rely on the stored char map to correctly decode the character bits
+                color_bin = line[3:9].rjust(6, "0")
+                char_bin = line[9:16].rjust(7, "0")
+                color = REVERSE_COLOR_MAP.get(color_bin, "black")
+                char = self.reverse_char_map.get(char_bin, " ")
+
+                self.grid_data.set(r, c, color, char)
+
+            self.end_edit()
             self.refresh_grid_ui()
             messagebox.showinfo("Imported", "File loaded successfully!")
             self.mark_unsaved()
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
+    def import_image_file(self):
+        fp = filedialog.askopenfilename(filetypes=image_import.IMAGE_FILETYPES)
+        if not fp: return
+        try:
+            with Image.open(fp) as img:
+                colors = image_import.image_to_colors(img, self.grid_data.rows, self.grid_data.cols, PALETTE_RGB, self.image_dither.get())
+        except Exception as e:
+            return messagebox.showerror("Error", f"Could not import image: {e}")
+
+        # The image replaces the design; chars are cleared
+        self.begin_edit("Image import")
+        self.grid_data.colors[:] = colors
+        self.grid_data.chars[:] = bytes(len(colors))
+        self.end_edit()
+        self.refresh_grid_ui()
+        self.clear_focus()
+        self.clear_selection()
+        self.mark_unsaved()
+        self.log(f"Imported {os.path.basename(fp)} at {self.grid_data.cols}x{self.grid_data.rows} ({self.image_dither.get()} dithering).", "warn")
+
+    def import_animation(self, folder=False):
+        """Quantizes every frame to one panel and sends the unique ones to the encoder (one Location each)."""
+        fp = filedialog.askdirectory() if folder else filedialog.askopenfilename(filetypes=[("Animated GIF", "*.gif"), *image_import.IMAGE_FILETYPES])
+        if not fp: return
+        free = encoder_core.MAX_LOCATIONS - len(self.files_to_encode)
+        if free <= 0:
+            return self.log(f"The encoder list already fills all {encoder_core.MAX_LOCATIONS} Locations.", "error")
+
+        try:
+            result = image_import.import_frames(image_import.iter_frames(fp), GRID_SIZE, GRID_SIZE, PALETTE_RGB,
+                                                self.image_dither.get(), max_frames=free)
+        except Exception as e:
+            return messagebox.showerror("Error", f"Could not import animation: {e}")
+        if not result.frames:
+            return self.log(f"No frames found in {os.path.basename(fp)}.", "error")
+
+        stem = os.path.splitext(os.path.basename(os.path.normpath(fp)))[0]
+        blank_chars = bytearray(GRID_SIZE * GRID_SIZE)
+        for i, colors in enumerate(result.frames):
+            name = f"Anim_{stem}_F{i}"
+            n = 1
+            while name in self.virtual_files or name in self.files_to_encode:
+                name = f"Anim_{stem}_F{i}_{n}"
+                n += 1
+            panel = grid_model.GridModel(GRID_SIZE, GRID_SIZE, colors, bytearray(blank_chars))
+            self.virtual_files[name] = self.get_grid_as_text(panel)
+            self.files_to_encode.append(name)
+            self.file_listbox.insert("end", f"[Live] {name}")
+        self.update_boot_options()
+        self.tabview.set("EEPROM Encoder")
+        self.log(f"Imported {os.path.basename(os.path.normpath(fp))}: {result.report()}", "warn")
+        if result.over_limit:
+            self.log(f"Only {free} Location(s) were free; {result.over_limit} unique frame(s) were dropped.", "warn")
+
+    def import_paste_clipboard(self):
+        try:
+            text = self.clipboard_get()
+        except tk.TclError:
+            return self.log("Clipboard is empty.", "error")
+        self.import_paste_string(text, "clipboard")
+
+    def import_paste_file(self):
+        fp = filedialog.askopenfilename(filetypes=[("EEPROM Data", "*.dat"), ("Text Files", "*.txt"), ("All Files", "*.*")])
+        if not fp: return
+        try:
+            with open(fp, "r", encoding="utf-8") as f:
+                text = f.read()
+        except Exception as e:
+            return messagebox.showerror("Error", f"Could not read file: {e}")
+        self.import_paste_string(text, os.path.basename(fp))
+
+    def is_design_word(self, word):
+        """True if a word splits into a known color and character (used to resolve 8-bit decodes)."""
+        line = "{:016b}".format(word)
+        return line[3:9] in REVERSE_COLOR_MAP and line[9:16] in self.reverse_char_map
+
+    def import_paste_string(self, text, source):
+        """Decodes a paste string, restores its Locations as virtual files and loads the boot design."""
+        try:
+            decoded = decoder_core.decode_paste(text, self.is_design_word)
+        except decoder_core.DecodeError as e:
+            return messagebox.showerror("Import Failed", f"Not a valid paste string: {e}")
+
+        for message in decoded.warnings:
+            self.log(message, "warn")
+
+        if not decoded.locations:
+            return self.log(f"No design data found in paste from {source}.", "error")
+
+        count = decoded.file_count if decoded.file_count else max(decoded.locations) + 1
+        count = min(count, encoder_core.MAX_LOCATIONS)
+        boot = decoded.boot_index if decoded.boot_index is not None and decoded.boot_index < count else 0
+        self.log(f"Decoded {len(decoded.pairs)} words from {source}: {count} location(s), boot index {boot}.", "info")
+
+        # Optionally replace the encoder list with the recovered Locations
+        if messagebox.askyesno("Import Paste", f"Recovered {count} location(s).\nReplace the encoder file list with them?"):
+            for name in self.files_to_encode:
+                self.virtual_files.pop(name, None)
+            self.files_to_encode = []
+            for loc in range(count):
+                name = f"Recovered_Location_{loc}"
+                self.virtual_files[name] = decoder_core.words_to_text(decoded.location_words(loc, GRID_SIZE * GRID_SIZE))
+                self.files_to_encode.append(name)
+
+            self.is_16bit.set(decoded.type16)
+            self.file_listbox.delete(0, "end")
+            self._refresh_listbox_indices(0)
+            self.update_boot_options()
+            self.boot_index.set(f"File {boot}: {self.files_to_encode[boot]}")
+
+        # Load the boot Location into the designer (a wall gets Locations 0, 1, 2... panel by panel)
+        panels = self.grid_data.tile_count(GRID_SIZE)
+        locations = [boot] if panels == 1 else list(range(min(count, panels)))
+        self.begin_edit("Paste import")
+        self.grid_data.clear()
+        for panel, loc in enumerate(locations):
+            top, left = self.grid_data.tile_origin(panel, GRID_SIZE)
+            self.grid_data.paste(grid_model.GridModel.from_dicts(
+                decoder_core.words_to_grid(decoded.location_words(loc, GRID_SIZE * GRID_SIZE), self.reverse_char_map, REVERSE_COLOR_MAP, GRID_SIZE)), top, left)
+        self.end_edit()
+        self.refresh_grid_ui()
+        self.clear_focus()
+        self.clear_selection()
+        self.mark_unsaved()
+        self.log(f"Loaded location(s) {', '.join(map(str, locations))} into the designer.", "warn")
+
     def save_project(self):
-        fp = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON Project", "*.json")])
+        fp = filedialog.asksaveasfilename(defaultextension=project_file.PROJECT_EXT, filetypes=PROJECT_FILETYPES)
         if not fp: 
             return False
-        
+
+        # A lazily loaded .blp keeps its file mapped; read the rest in and release it so it can be overwritten
+        if isinstance(self.virtual_files, project_file.LazyVirtualFiles):
+            self.virtual_files = self.virtual_files.close()
+
+        if fp.lower().endswith(".json"):
+            return self.save_project_json(fp)
+        try:
+            project_file.save(fp, self.grid_data, self.binary_chars, self.files_to_encode, self.virtual_files, self.is_16bit.get())
+            self.log(f"Project saved (binary). Size: {os.path.getsize(fp)} bytes.", "warn")
+            self.mark_saved()
+            return True
+        except Exception as e:
+            self.log(f"Error saving project: {e}", "error")
+            return False
+
+    def save_project_json(self, fp):
         # Use compression
         compressed_data = self.compress_grid()
 
         project_data = {
             "version": "2.0", # Bump version to indicate new format
             "compressed_grid": compressed_data, # Store the small RLE list
+            "grid_rows": self.grid_data.rows, # Wall size in cells (absent in single-panel projects)
+            "grid_cols": self.grid_data.cols,
             "virtual_files": self.virtual_files,
             "files_to_encode": self.files_to_encode,
             "is_16bit": self.is_16bit.get(),
@@ -1385,33 +1651,45 @@ class CombinedEEPROMApp(ctk.CTk):
             return False      
 
     def load_project(self):
-        fp = filedialog.askopenfilename(filetypes=[("JSON Project", "*.json")])
+        fp = filedialog.askopenfilename(filetypes=[("Projects", "*.blp *.json"), *PROJECT_FILETYPES])
         if not fp: return
         
         try:
-            with open(fp, "r") as f:
-                project_data = json.load(f)
-            
-            # CHECK: Is this a new compressed file or an old one?
-            if "compressed_grid" in project_data:
-                # Decode the new compact format
-                self.grid_data = self.decompress_grid(project_data["compressed_grid"])
-                self.log("Loaded compressed project format (v2.0).", "info")
+            if project_file.is_binary_project(fp):
+                # Virtual files stay in the mapped file until something reads them
+                project_data = project_file.load(fp)
+                grid = project_data["grid"] or self.grid_data
+                self.log(f"Loaded binary project format (v{project_file.FORMAT_VERSION}).", "info")
             else:
-                # Fallback for old files
-                self.grid_data = project_data.get("grid_data", self.grid_data)
-                self.log("Loaded legacy project format.", "info")
+                with open(fp, "r") as f:
+                    project_data = json.load(f)
+
+                # CHECK: Is this a new compressed file or an old one?
+                if "compressed_grid" in project_data:
+                    # Decode the new compact format
+                    grid = self.decompress_grid(project_data["compressed_grid"],
+                                                project_data.get("grid_rows", GRID_SIZE), project_data.get("grid_cols", GRID_SIZE))
+                    self.log("Loaded compressed project format (v2.0).", "info")
+                else:
+                    # Fallback for old files
+                    grid = grid_model.GridModel.from_dicts(project_data["grid_data"]) if "grid_data" in project_data else self.grid_data
+                    self.log("Loaded legacy project format.", "info")
 
+            if isinstance(self.virtual_files, project_file.LazyVirtualFiles):
+                self.virtual_files.close() # Release the previous project's mapped file
             self.virtual_files = project_data.get("virtual_files", {})
             self.files_to_encode = project_data.get("files_to_encode", [])
             self.is_16bit.set(project_data.get("is_16bit", True))
             
-            if "binary_chars" in project_data:
+            charmap_changed = project_data.get("binary_chars") and project_data["binary_chars"] != self.binary_chars
+            if charmap_changed:
                 self.binary_chars = project_data["binary_chars"]
                 self.reverse_char_map = {v.rjust(7, "0"): k for k, v in self.binary_chars.items()}
+                self.invalidate_word_table()
 
-            self.refresh_grid_ui()
-            self.setup_charmap_tab()
+            self.set_grid_size(grid)
+            self.history.clear() # Undo does not reach back into the previous project
+            if charmap_changed: self.setup_charmap_tab() # Rebuilding the charmap tab is the slowest part of a load
             
             self.file_listbox.delete(0, "end")
             for p in self.files_to_encode:
@@ -1491,7 +1769,25 @@ class CombinedEEPROMApp(ctk.CTk):
         # NEW FEATURE: Data Integrity Checkbox
         self.check_integrity = ctk.BooleanVar(value=True)
         ctk.CTkSwitch(settings_box, text="High Integrity Check (Disable for speed)", variable=self.check_integrity, 
-                      font=(FONT_FAMILY, 11), onvalue=True, offvalue=False).pack(pady=(5, 10), padx=15, anchor="w")
+                      font=(FONT_FAMILY, 11), onvalue=True, offvalue=False).pack(pady=(5, 5), padx=15, anchor="w")
+
+        # Sparse Output: leave out words equal to the fill value (blank cells)
+        self.sparse_output = ctk.BooleanVar(value=False)
+        sparse_f = ctk.CTkFrame(settings_box, fg_color="transparent")
+        sparse_f.pack(fill="x", padx=15, pady=(5, 10))
+        ctk.CTkSwitch(sparse_f, text="Sparse Output (skip words equal to fill)", variable=self.sparse_output,
+                      font=(FONT_FAMILY, 11), onvalue=True, offvalue=False).pack(side="left")
+        self.sparse_fill = ctk.CTkEntry(sparse_f, width=90, font=("Consolas", 11), placeholder_text="Fill value")
+        self.sparse_fill.insert(0, "0")
+        self.sparse_fill.pack(side="right")
+        # The designer's live size preview follows the sparse setting
+        self.sparse_output.trace_add("write", lambda *_: self.invalidate_size_preview())
+        self.sparse_fill.bind("<KeyRelease>", lambda e: self.invalidate_size_preview())
+
+        # Watch Mode: re-encode when a source .txt is saved in another editor
+        self.watch_sources = ctk.BooleanVar(value=False)
+        ctk.CTkSwitch(settings_box, text="Watch Sources (auto re-encode on save)", variable=self.watch_sources, command=self.toggle_watch,
+                      font=(FONT_FAMILY, 11), onvalue=True, offvalue=False).pack(pady=(0, 10), padx=15, anchor="w")
 
         
         # --- Group 1.5: EEPROM Usage Dashboard (NEW - Row 2) ---
@@ -1507,6 +1803,9 @@ class CombinedEEPROMApp(ctk.CTk):
         self.progress_total = ctk.CTkProgressBar(usage_box, height=10, corner_radius=5, fg_color="#333333", progress_color="#3498db")
         self.progress_total.set(0.0)
         self.progress_total.pack(fill="x", padx=15, pady=(0, 8))
+
+        self.lbl_sparse_savings = ctk.CTkLabel(usage_box, text="Sparse Output: off", font=(FONT_FAMILY, 11), anchor="w")
+        self.lbl_sparse_savings.pack(fill="x", padx=15, pady=(0, 4))
         
         # 2. File Saturation Details (Scrollable List)
         ctk.CTkLabel(usage_box, text="File Saturation (Max 256 addresses per file):", font=(FONT_FAMILY, 11, "bold"), anchor="w").pack(fill="x", padx=15, pady=(4, 2))
@@ -1536,11 +1835,29 @@ class CombinedEEPROMApp(ctk.CTk):
         ctk.CTkSegmentedButton(boot_output_box, variable=self.output_mode, 
                                values=["Clipboard", "Save File (.dat)"], font=(FONT_FAMILY, 11), height=35).pack(fill="x", padx=10, pady=(0, 10))
 
-
-        # --- Compile Button (Row 4 - BUMPED) ---
-        ctk.CTkButton(right, text="🚀 COMPILE & EXPORT", font=(FONT_FAMILY, 16, "bold"), 
-                      fg_color=THEME["success"], hover_color=THEME["success_hover"], 
-                      command=self.run_encoder, height=50).grid(row=4, column=0, sticky="ew", padx=15, pady=(10, 20)) # OLD ROW 3
+        # Paste-sized chunks (clipboard: copied one at a time, file: .partNN files)
+        self.chunk_size = ctk.StringVar(value="Off")
+        chunk_f = ctk.CTkFrame(boot_output_box, fg_color="transparent")
+        chunk_f.pack(fill="x", padx=10, pady=(0, 10))
+        chunk_f.grid_columnconfigure((0, 1), weight=1)
+        ctk.CTkLabel(chunk_f, text="Split Into Chunks", anchor="w", font=(FONT_FAMILY, 12, "bold")).grid(row=0, column=0, columnspan=2, sticky="w", pady=(0, 2))
+        ctk.CTkOptionMenu(chunk_f, variable=self.chunk_size, values=list(CHUNK_SIZES), font=(FONT_FAMILY, 11), height=35).grid(row=1, column=0, sticky="ew", padx=(0, 5))
+        self.btn_next_chunk = ctk.CTkButton(chunk_f, text="Copy Next Chunk", state="disabled", **BTN_STYLE, command=self.copy_next_chunk)
+        self.btn_next_chunk.grid(row=1, column=1, sticky="ew", padx=(5, 0))
+
+
+        # --- Compile / Cancel Buttons (Row 4 - BUMPED) ---
+        compile_f = ctk.CTkFrame(right, fg_color="transparent")
+        compile_f.grid(row=4, column=0, sticky="ew", padx=15, pady=(10, 20)) # OLD ROW 3
+        compile_f.grid_columnconfigure(0, weight=1)
+        self.btn_compile = ctk.CTkButton(compile_f, text="🚀 COMPILE & EXPORT", font=(FONT_FAMILY, 16, "bold"), 
+                                         fg_color=THEME["success"], hover_color=THEME["success_hover"], 
+                                         command=self.run_encoder, height=50)
+        self.btn_compile.grid(row=0, column=0, sticky="ew")
+        self.btn_cancel_encode = ctk.CTkButton(compile_f, text="Cancel", font=(FONT_FAMILY, 14, "bold"), width=90, height=50,
+                                               fg_color=THEME["error"], hover_color=THEME["error_hover"],
+                                               state="disabled", command=self.cancel_encoder)
+        self.btn_cancel_encode.grid(row=0, column=1, padx=(10, 0))
 
         # --- Console Output (Row 5 - BUMPED) ---
         ctk.CTkLabel(right, text="🖥️ Console Log", font=(FONT_FAMILY, 14, "bold")).grid(row=5, column=0, sticky="w", padx=15, pady=(0, 5)) # OLD ROW 4
@@ -1620,7 +1937,7 @@ class CombinedEEPROMApp(ctk.CTk):
         
         # 1. Handle Virtual File Cleanup
         name = self.files_to_encode[idx]
-        if name.startswith("Virtual_Design_") and name in self.virtual_files: 
+        if name in self.virtual_files: 
             del self.virtual_files[name]
         
         # 2. Remove the file path and listbox entry
@@ -1698,7 +2015,7 @@ class CombinedEEPROMApp(ctk.CTk):
 
         self.log(f"Saved {len(self.virtual_files)} virtual files to {target_dir}.", "warn")
         
-    def update_usage_dashboard(self, total_written, file_counts):
+    def update_usage_dashboard(self, total_written, file_counts, saved_chars=None, output_chars=0, files=None):
         # Constants
         TOTAL_MAX = 4096 # 16 Locations * 256 Pixels
         FILE_MAX = 256   # Max pixels per file/location
@@ -1707,6 +2024,14 @@ class CombinedEEPROMApp(ctk.CTk):
         percentage = total_written / TOTAL_MAX if TOTAL_MAX > 0 else 0
         self.progress_total.set(percentage)
         self.lbl_total_usage.configure(text=f"Total Memory Used: {total_written} / {TOTAL_MAX} Addresses ({percentage*100:.1f}%)")
+
+        # --- Sparse Output Savings ---
+        if saved_chars is None:
+            self.lbl_sparse_savings.configure(text="Sparse Output: off")
+        else:
+            full_chars = output_chars + saved_chars
+            saved_pct = saved_chars / full_chars * 100 if full_chars else 0
+            self.lbl_sparse_savings.configure(text=f"Sparse Output: saved {saved_chars} of {full_chars} bytes ({saved_pct:.1f}%)")
         
         # --- Clear and Update File Usage Details ---
         
@@ -1720,7 +2045,7 @@ class CombinedEEPROMApp(ctk.CTk):
              return
              
         for i, count in enumerate(file_counts):
-            file_name = os.path.basename(self.files_to_encode[i])
+            file_name = os.path.basename((files or self.files_to_encode)[i])
             file_percentage = count / FILE_MAX
             
             # Use red/warning color if the file is over 80% full
@@ -1758,176 +2083,251 @@ class CombinedEEPROMApp(ctk.CTk):
                 return 0 # Should not happen
         return 0
 
-    def run_encoder(self):
+    def run_encoder(self, changed=None):
+        """Compile button handler. Watch mode passes the `changed` source paths and reuses the last output file."""
+        if self.encode_thread is not None:
+            self.log("An encode is already running.", "warn")
+            return
+
         self.console.configure(state="normal")
         self.console.delete("1.0", "end")
         self.console.configure(state="disabled")
+        if changed:
+            self.log(f"Source changed: {', '.join(os.path.basename(p) for p in changed)}. Re-encoding...", "warn")
         
         if not self.files_to_encode:
             self.log("No files selected!", "error")
             return
-        if not self.binary_chars:
-            self.log("BinaryChars.json not loaded. Cannot encode.", "error")
-            return
 
-        # Check file count limit (4-bit Location field limit)
-        num_files = len(self.files_to_encode)
-        if num_files > 16:
-            self.log(f"FATAL ERROR: Maximum number of save files is 16 (0-15), but {num_files} were selected.", "error")
-            return
-
-        try:
-            # 1. Setup & Helper Functions
-            type16 = self.is_16bit.get() # Should be True (16-bit data word)
-            header = "#dHCAgA/" if type16 else "XDCAgA/"
-            output_string = header
-            digits = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ!@$%?&<()"
-            total_addresses_written = 0
-            file_addresses_written = []
-            
-            # Helper functions remain the same: flip_byte, base71, calc_val
-
-            def flip_byte(n):
-                # Flips 16 bits if type16 is True
-                fmt = "{:016b}" if type16 else "{:08b}"
-                return int(fmt.format(n)[::-1], 2)
-
-            def base71(n):
-                # Encodes 16-bit word into 3 base71 chars
-                if n == 0: return "00" + ("0" if type16 else "")
-                out = ""
-                while n > 0:
-                    n, r = divmod(n, 71)
-                    out = digits[r] + out
-                return out.rjust(2 + type16, "0")
-
-            def calc_val(token):
-                # ... (calc_val logic from previous response) ...
-                token = token.strip()
-                if not token: return 0
-                if all(c in "01" for c in token) and len(token) > 2: return int(token, 2)
-                if token.isdigit(): return int(token)
-                if token.lower().startswith("h"): return int(token[1:], 16)
-                if len(token) == 1 and token in self.binary_chars: return int(self.binary_chars[token], 2)
-                if "+" in token:
-                    total = 0
-                    for part in token.split("+"):
-                        part = part.strip()
-                        if not part: continue
-                        if part.lower().startswith("b"): total += (1 << (int(part[1:]) - 1))
-                        else: total += calc_val(part)
-                    return total
-                raise ValueError(f"Unknown token: {token}")
+        type16 = self.is_16bit.get()
+        chunk_chars = CHUNK_SIZES.get(self.chunk_size.get(), 0)
 
-            
-            # 2. Sequential File Encoding
-            
-            # We don't need a single global address counter. We iterate through files
-            # (Location 0 to 15) and for each file, we use the local pixel address (0 to 255).
-            
-            # This will store the final EEPROM address before flipping/encoding
-            eeprom_address = 0 
-            
-            # 3. Encode File Data
-            
-            for file_index, filepath_or_name in enumerate(self.files_to_encode):
-                
-                # The file_index is the 4-bit Location field
-                location_bits = file_index 
+        skip_value = None
+        if self.sparse_output.get():
+            fill_text = self.sparse_fill.get().strip() or "0"
+            try:
+                skip_value = encoder_core.calc_val(fill_text, self.binary_chars)
+            except Exception as e:
+                self.log(f"Invalid sparse fill value '{fill_text}': {e}", "error")
+                return
 
-                is_virtual = filepath_or_name in self.virtual_files
-                filename = os.path.basename(filepath_or_name) if not is_virtual else filepath_or_name
-                self.log(f"Encoding File {file_index} (Location {location_bits}) : {filename}...", "info")
-                
-                if is_virtual:
-                    lines = self.virtual_files[filepath_or_name].splitlines()
-                else:
-                    try:
-                        with open(filepath_or_name, "r", encoding="utf-8") as f:
-                            lines = f.read().splitlines()
-                    except FileNotFoundError:
-                        self.log(f"File not found: {filename}. Skipping.", "error")
-                        continue
-                
-                local_pixel_address = 0 
-                current_file_address_count = 0 # NEW: Counter for the current file
-                
-                max_val = (1 << 16) - 1 # 16-bit max value (65535)
+        fp = None
+        if self.output_mode.get() != "Clipboard":
+            if changed:
+                if not self.last_output_path:
+                    self.log("Watch mode: press COMPILE & EXPORT once to choose the output file.", "warn")
+                    return
+                fp = self.last_output_path
+            else:
+                fp = filedialog.asksaveasfilename(defaultextension=".dat", filetypes=[("EEPROM Data", "*.dat"), ("Text Files", "*.txt")])
+                if not fp: return
+                self.last_output_path = fp
+
+        # The worker only ever sees this snapshot, so editing files mid-encode is safe
+        job = dict(
+            out_path=fp,
+            files=list(self.files_to_encode),
+            virtual_files=dict(self.virtual_files),
+            binary_chars=dict(self.binary_chars),
+            type16=type16,
+            boot_index=self.get_boot_file_index(),
+            chunk_chars=chunk_chars,
+            skip_value=skip_value,
+            verify=self.check_integrity.get(),
+        )
 
-                for line_num, line in enumerate(lines):
-                    
-                    # --- Local Address Check ---
-                    if local_pixel_address > 255:
-                        self.log(f"WARN: File {file_index} ({filename}) truncated after 256 addresses (Pixel 0xFF).", "warn")
-                        break # Stop processing this file's lines
-
-                    clean_line = line.split("//")[0].strip()
-                    if not clean_line or clean_line.startswith("#"): 
-                        continue # Skip empty/comment lines
-
-                    try:
-                        val = calc_val(clean_line)
-                        if val > max_val:
-                            self.log(f"Line {line_num+1}: Value {val} too high for 16-bit EEPROM word.", "error")
-                            return
-
-                        # Construct the 16-bit EEPROM address:
-                        eeprom_address = (location_bits << 8) | local_pixel_address
-
-                        # Write the encoded data
-                        output_string += base71(flip_byte(eeprom_address)) # Address word
-                        output_string += base71(flip_byte(val))            # Data word
-                        
-                        local_pixel_address += 1
-
-                        # NEW: Increment file and total counters
-                        if val != 0:
-                            current_file_address_count += 1
-                            total_addresses_written += 1
-
-                    except Exception as e:
-                        self.log(f"Error in {filename} line {line_num+1} ({clean_line}): {e}", "error")
-                        return
-
-            file_addresses_written.append(current_file_address_count)
-
-            # --- 4. Write Header to High Addresses (0xFFFC to 0xFFFF) ---
-            self.update_usage_dashboard(total_addresses_written, file_addresses_written)
-            header_start_addr = (15 << 8) | 252 # Location 15 (0xF), Pixel 252 (0xFC) = 0xFFFC
-            current_addr = header_start_addr
-            
-            self.log(f"Writing system header to high addresses (0x{header_start_addr:04X} to 0xFFFF)...", "info")
+        self.encode_cancel = threading.Event()
+        self.encode_queue = queue.Queue()
+        self.encode_thread = threading.Thread(target=self._encode_worker, args=(job, self.encode_queue, self.encode_cancel), daemon=True)
+        self.btn_compile.configure(state="disabled")
+        self.btn_cancel_encode.configure(state="normal")
+        self.progress_total.set(0)
+        self.lbl_total_usage.configure(text=f"Encoding... Location 0 / {len(job['files'])}")
+        self.encode_thread.start()
+        self.after(ENCODE_POLL_MS, self._poll_encode_queue)
+
+    # --- Watch Mode ---
+    def toggle_watch(self):
+        if self.watch_sources.get():
+            self.source_watcher.reset(self.watched_paths()) # Edits made while watch was off are not changes
+            self.log(f"Watch mode on: re-encoding when any of {len(self.watched_paths())} source file(s) is saved.", "info")
+            if self.watch_timer is None:
+                self.watch_timer = self.after(WATCH_POLL_MS, self._watch_poll)
+        else:
+            if self.watch_timer is not None:
+                self.after_cancel(self.watch_timer)
+                self.watch_timer = None
+            self.watch_changed.clear()
+            self.log("Watch mode off.", "info")
+
+    def watched_paths(self):
+        """Sources on disk; virtual designs only change from inside the app."""
+        return [p for p in self.files_to_encode if p not in self.virtual_files]
+
+    def _watch_poll(self):
+        self.watch_timer = None
+        if not self.watch_sources.get(): return
+
+        self.source_watcher.track(self.watched_paths())
+        self.watch_changed.update(self.source_watcher.poll())
+        if self.watch_changed and self.encode_thread is None:
+            changed = sorted(self.watch_changed)
+            self.watch_changed.clear()
+            # The encode cache only re-encodes Locations whose files actually changed
+            self.run_encoder(changed=changed)
+        self.watch_timer = self.after(WATCH_POLL_MS, self._watch_poll)
+
+    def cancel_encoder(self):
+        if self.encode_thread is None: return
+        self.encode_cancel.set()
+        self.btn_cancel_encode.configure(state="disabled")
+        self.log("Cancelling after the current Location...", "warn")
+
+    def _encode_worker(self, job, q, cancel):
+        """Runs on a background thread. Never touches Tk; everything goes back through `q`."""
+        encode_args = dict(
+            type16=job["type16"],
+            boot_index=job["boot_index"],
+            log=lambda msg, level="info": q.put(("log", msg, level)),
+            cache=self.encode_cache,
+            skip_value=job["skip_value"],
+            progress=lambda done, total: q.put(("progress", done, total)),
+            cancel=cancel,
+        )
+        try:
+            if job["verify"]:
+                # Encode and verify from one read of the sources; a save in between would fail the check
+                job = dict(job, virtual_files=encoder_core.snapshot_sources(job["files"], job["virtual_files"]))
+            if job["out_path"]:
+                # Stream each Location straight to disk instead of building one big string
+                result, written = encoder_core.encode_to_file(job["out_path"], job["files"], job["virtual_files"], job["binary_chars"],
+                                                              chunk_chars=job["chunk_chars"], **encode_args)
+                chunks = None
+            else:
+                chunks = []
+                sink = encoder_core.ChunkedSink(lambda i, text: chunks.append(text), job["chunk_chars"], job["type16"]) if job["chunk_chars"] else None
+                result = encoder_core.encode_project(job["files"], job["virtual_files"], job["binary_chars"], sink=sink, **encode_args)
+                if sink is None:
+                    chunks = [result.output]
+                written = None
+
+            if job["verify"]:
+                if cancel.is_set():
+                    raise encoder_core.EncodeCancelled("Encoding cancelled before verification.")
+                self._verify_encode(job, chunks, written, encode_args["log"])
+        except encoder_core.EncodeCancelled:
+            q.put(("cancelled",))
+        except encoder_core.EncodeError as e:
+            q.put(("error", str(e)))
+        except Exception as e:
+            q.put(("critical", e))
+        else:
+            q.put(("done", job, result, chunks, written))
 
-            # Address 0xFFFC: Number of Files
-            output_string += base71(flip_byte(current_addr)) + base71(flip_byte(num_files))
-            current_addr += 1
+    def _verify_encode(self, job, chunks, written, log):
+        """High Integrity Check: decodes the output again and compares it with the sources it was encoded from (worker thread)."""
+        if written is not None:
+            chunks = []
+            for path in written:
+                with open(path, "r", encoding="utf-8") as f:
+                    chunks.append(f.read())
 
-            # Address 0xFFFD: Boot File Index
-            boot_index_val = self.get_boot_file_index()
-            output_string += base71(flip_byte(current_addr)) + base71(flip_byte(boot_index_val))
-            current_addr += 1
+        log("Verifying output (High Integrity Check)...", "info")
+        try:
+            expected = encoder_core.project_source_words(job["files"], job["virtual_files"], job["binary_chars"])
+            report = decoder_core.verify_output(chunks, expected, job["boot_index"], job["type16"], job["skip_value"])
+        except (encoder_core.EncodeError, decoder_core.DecodeError) as e:
+            log(f"Integrity check failed: {e}", "error")
+            return
 
-            # Address 0xFFFE, 0xFFFF: Reserved/Unused (Set to 0)
-            output_string += base71(flip_byte(current_addr)) + base71(flip_byte(0))
-            current_addr += 1
-            output_string += base71(flip_byte(current_addr)) + base71(flip_byte(0))
-            # current_addr is now 0x10000, outside the 16-bit range.
+        for message in report.header_errors:
+            log(f"Integrity check: {message}", "error")
+        for location, bad in sorted(report.mismatches.items()):
+            pixel, want, got = bad[0]
+            log(f"Integrity check: Location {location} has {len(bad)} mismatched word(s); first at pixel {pixel} (expected {want}, decoded {got}).", "error")
+        if report.timed_out:
+            log(f"Integrity check stopped at its time budget after {report.checked_locations} location(s).", "warn")
+        elif report.ok:
+            log(f"Integrity check passed: {report.checked_words} words across {report.checked_locations} location(s).", "info")
+
+    def _poll_encode_queue(self):
+        """Drains worker messages on the Tk thread; reschedules itself until the worker reports back."""
+        finished = False
+        while True:
+            try:
+                msg = self.encode_queue.get_nowait()
+            except queue.Empty:
+                break
 
-            # --- 5. FINAL MARKER AND COPY ---
-            
-            # Add the final end marker
-            output_string += "=1"
+            kind = msg[0]
+            if kind == "log":
+                self.log(msg[1], msg[2])
+            elif kind == "progress":
+                done, total = msg[1], msg[2]
+                self.progress_total.set(done / total if total else 0)
+                self.lbl_total_usage.configure(text=f"Encoding... Location {done} / {total}")
+            elif kind == "done":
+                self._finish_encode(*msg[1:])
+                finished = True
+            elif kind == "cancelled":
+                self.progress_total.set(0)
+                self.lbl_total_usage.configure(text="Encoding cancelled.")
+                self.log("Encoding cancelled. No output was produced.", "warn")
+                finished = True
+            elif kind == "error":
+                self.log(msg[1], "error")
+                finished = True
+            elif kind == "critical":
+                self.log(f"Critical Error: {msg[1]}", "error")
+                messagebox.showerror("Encoding Error", f"A critical error occurred during encoding: {msg[1]}")
+                finished = True
+
+        if finished or not self.encode_thread.is_alive() and self.encode_queue.empty():
+            self.encode_thread = None
+            self.btn_compile.configure(state="normal")
+            self.btn_cancel_encode.configure(state="disabled")
+            return
+        self.after(ENCODE_POLL_MS, self._poll_encode_queue)
 
+    def _finish_encode(self, job, result, chunks, written):
+        if written is not None:
+            output_chars = sum(os.path.getsize(p) for p in written)
+        else:
+            output_chars = sum(len(c) for c in chunks)
+        self.update_usage_dashboard(result.total_written, result.file_counts,
+                                    result.saved_chars if job["skip_value"] is not None else None, output_chars, job["files"])
+        self.log("--------------------------------")
+
+        if written is not None:
+            self.pending_chunks = []
+            self.btn_next_chunk.configure(state="disabled")
+            self.log(f"SUCCESS! Output saved to {len(written)} file(s): {', '.join(os.path.basename(p) for p in written)}", "warn")
+        elif len(chunks) == 1:
             # Copy the entire encoded string to the clipboard
+            self.pending_chunks = []
+            self.btn_next_chunk.configure(state="disabled")
             self.clipboard_clear()
-            self.clipboard_append(output_string)
-            self.log("--------------------------------")
+            self.clipboard_append(chunks[0])
             self.log(f"SUCCESS! Output copied to clipboard.", "warn")
-            self.log(f"Encoded {num_files} files. Final Header Address: 0xFFFF.", "warn")
-            
-        except Exception as e:
-            self.log(f"Critical Error: {e}", "error")
-            messagebox.showerror("Encoding Error", f"A critical error occurred during encoding: {e}")
+        else:
+            self.pending_chunks = chunks
+            self.chunk_total = len(chunks)
+            self.copy_next_chunk()
+
+        self.log(f"Encoded {len(job['files'])} files. Final Header Address: 0xFFFF.", "warn")
+
+    def copy_next_chunk(self):
+        """Copies the next pending paste chunk to the clipboard."""
+        if not self.pending_chunks:
+            self.btn_next_chunk.configure(state="disabled")
+            return
+
+        chunk = self.pending_chunks.pop(0)
+        self.clipboard_clear()
+        self.clipboard_append(chunk)
+        done = self.chunk_total - len(self.pending_chunks)
+        self.log(f"Chunk {done}/{self.chunk_total} copied to clipboard ({len(chunk)} chars). Paste it before copying the next.", "warn")
+        self.btn_next_chunk.configure(state="normal" if self.pending_chunks else "disabled")
 
     # --- FEATURE: Character Map Editor ---
     def setup_charmap_tab(self):
@@ -2014,6 +2414,7 @@ class CombinedEEPROMApp(ctk.CTk):
         
         self.binary_chars = new_map
         self.reverse_char_map = {v: k for k, v in new_map.items()}
+        self.invalidate_word_table()
         self.save_char_map()
         self.log("New character map applied and saved to file.", "warn")
 
@@ -2047,6 +2448,7 @@ class CombinedEEPROMApp(ctk.CTk):
             # Update internal state
             self.binary_chars = valid_entries
             self.reverse_char_map = {v: k for k, v in valid_entries.items()}
+            self.invalidate_word_table()
             
             # Save the new map to the application's local file for persistence
             self.save_char_map() 
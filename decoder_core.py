@@ -0,0 +1,333 @@
+# decoder_core.py
+"""
+Inverse of the EEPROM encoder: turns a paste string back into per-Location words.
+
+16-bit strings ("#dHCAgA/...=1") decode exactly through a reverse word table.
+8-bit strings ("XDCAgA/...=1") are best effort: their words are 2 or 3 chars
+wide and 8-bit flip_byte is not one-to-one above 0xFF, so the decoder follows
+the encoder's address order and prefers words that are valid design cells.
+"""
+
+import time
+
+import encoder_core
+from encoder_core import (END_MARKER, HEADER_16BIT, HEADER_8BIT, LOCATION_SIZE, MAX_LOCATIONS,
+                          SYSTEM_HEADER_ADDR)
+
+DEFAULT_VERIFY_BUDGET = 2.0 # Seconds; a full 4096-word image verifies well inside this
+DEADLINE_CHECK_STEPS = 256 # Parser steps between clock checks when a deadline is set
+
+# Encoded chars -> word(s), built once per data mode from encoder_core's word tables
+_DECODE_TABLES = {}
+
+
+class DecodeError(Exception):
+    """Raised when a paste string is malformed or cannot be parsed."""
+
+
+class DecodeTimeout(DecodeError):
+    """Raised when decoding runs past its deadline."""
+
+
+def _check_deadline(deadline):
+    if deadline is not None and time.perf_counter() > deadline:
+        raise DecodeTimeout("Decoding ran out of time.")
+
+
+def decode_table(type16=True):
+    """
+    16-bit: {chars: word}. 8-bit: {chars: [words...]} since several words share an encoding.
+    """
+    table = _DECODE_TABLES.get(bool(type16))
+    if table is None:
+        words = encoder_core.word_table(type16)
+        if type16:
+            table = {enc: n for n, enc in enumerate(words)}
+        else:
+            table = {}
+            for n, enc in enumerate(words):
+                table.setdefault(enc, []).append(n)
+        _DECODE_TABLES[bool(type16)] = table
+    return table
+
+
+class DecodedImage:
+    """Everything recovered from one paste string."""
+
+    def __init__(self, type16, pairs, locations, file_count, boot_index, warnings):
+        self.type16 = type16
+        self.pairs = pairs            # [(address, word)] in string order (system header included)
+        self.locations = locations    # {location: [word per pixel]}, None where sparse output skipped a pixel
+        self.file_count = file_count  # Word at SYSTEM_HEADER_ADDR, or None
+        self.boot_index = boot_index  # Word at SYSTEM_HEADER_ADDR + 1, or None
+        self.warnings = warnings
+
+    def location_words(self, location, size=LOCATION_SIZE, fill=0):
+        """The words of one Location padded to `size` pixels; gaps (sparse output) become `fill`."""
+        words = [fill if w is None else w for w in self.locations.get(location, [])]
+        return words + [fill] * (size - len(words))
+
+
+def split_paste(text):
+    """Returns (type16, body) for a paste string, stripping the header and end marker."""
+    text = "".join(text.split()) # Pastes picked up from chat/files often gain line breaks
+    if text.startswith(HEADER_16BIT):
+        type16, body = True, text[len(HEADER_16BIT):]
+    elif text.startswith(HEADER_8BIT):
+        type16, body = False, text[len(HEADER_8BIT):]
+    else:
+        raise DecodeError(f"Unknown header: expected '{HEADER_16BIT}' or '{HEADER_8BIT}'.")
+
+    if body.endswith(END_MARKER):
+        body = body[:-len(END_MARKER)]
+    else:
+        raise DecodeError(f"Missing end marker '{END_MARKER}' (string truncated?).")
+    return type16, body
+
+
+def _parse_pairs_16(body, deadline=None):
+    if len(body) % 6:
+        raise DecodeError(f"Body length {len(body)} is not a whole number of 6-char address/data pairs.")
+    table = decode_table(True)
+    pairs = []
+    try:
+        for pos in range(0, len(body), 6):
+            if not pos % (6 * DEADLINE_CHECK_STEPS):
+                _check_deadline(deadline)
+            pairs.append((table[body[pos:pos + 3]], table[body[pos + 3:pos + 6]]))
+    except KeyError as e:
+        raise DecodeError(f"Invalid word {e} at char {pos + len(HEADER_16BIT)}.")
+    return pairs
+
+
+def _parse_pairs_8(body, is_valid_word, deadline=None):
+    """
+    Address-guided parse of an 8-bit body. Address words are always 2 chars wide, data
+    words 2 or 3, so the parser backtracks until every address is one the encoder could
+    emit next: a later pixel (sparse output may skip some), or the system header.
+    Parses ending on the last system header word are preferred. Raises DecodeTimeout
+    once `deadline` (a time.perf_counter() value) has passed.
+    """
+    table = decode_table(False)
+    end = len(body)
+    header_end = SYSTEM_HEADER_ADDR + 3
+
+    def next_gap(pos, address):
+        """Distance to the nearest address the encoder could emit after `address` at `pos`."""
+        if pos == end:
+            return 0
+        gaps = [a - address for a in table.get(body[pos:pos + 2], ()) if address < a <= header_end]
+        if address >= SYSTEM_HEADER_ADDR and SYSTEM_HEADER_ADDR in table.get(body[pos:pos + 2], ()):
+            gaps.append(1)
+        return min(gaps) if gaps else None
+
+    def choices_at(pos, prev):
+        options = [a for a in table.get(body[pos:pos + 2], ()) if a <= header_end]
+        addresses = sorted(a for a in options if prev is None or a > prev)
+        if prev is not None and prev >= SYSTEM_HEADER_ADDR and SYSTEM_HEADER_ADDR in options:
+            addresses.append(SYSTEM_HEADER_ADDR) # Header following Location 15's own last pixels
+        scored = []
+        for address in addresses:
+            for width in (2, 3):
+                words = table.get(body[pos + 2:pos + 2 + width])
+                gap = next_gap(pos + 2 + width, address) if words else None
+                if gap is None:
+                    continue
+                valid = [w for w in words if is_valid_word(w)]
+                scored.append(((address - (prev if prev is not None else -1), gap, width), (address, min(valid or words), pos + 2 + width)))
+        # Prefer contiguous addresses on both sides of the data word (the non-sparse encoder's order)
+        scored.sort(key=lambda item: (item[0][0] + item[0][1], item[0][2]))
+        return [choice for _, choice in scored]
+
+    def search(accept):
+        stack = [((0, None), choices_at(0, None))]
+        pairs = []
+        dead = set()
+        steps = 0
+        while stack:
+            steps += 1
+            if not steps % DEADLINE_CHECK_STEPS:
+                _check_deadline(deadline)
+            state, choices = stack[-1]
+            if not choices:
+                dead.add(state)
+                stack.pop()
+                if pairs: pairs.pop()
+                continue
+
+            address, word, next_pos = choices.pop(0)
+            if next_pos == end:
+                if accept(address):
+                    return pairs + [(address, word)]
+                continue
+
+            next_state = (next_pos, address)
+            if next_state in dead:
+                continue
+            pairs.append((address, word))
+            stack.append((next_state, choices_at(next_pos, address)))
+        return None
+
+    if not body:
+        return []
+
+    pairs = search(lambda last: last == header_end) or search(lambda last: True)
+    if pairs is None:
+        raise DecodeError("Could not split the 8-bit string into address/data pairs.")
+    return pairs
+
+
+def _parse_body(type16, body, is_valid_word, deadline=None):
+    if type16:
+        return _parse_pairs_16(body, deadline)
+    return _parse_pairs_8(body, is_valid_word or (lambda w: True), deadline)
+
+
+def _build_image(type16, pairs):
+    if not type16 and len(pairs) >= 4:
+        # 8-bit addresses collide (0x3FF, 0x7FE and 0x0FFC share an encoding), so relabel a
+        # trailing block that is indistinguishable from the system header as the header
+        words = encoder_core.word_table(False)
+        tail = pairs[-4:]
+        if all(words[a] == words[SYSTEM_HEADER_ADDR + i] for i, (a, _) in enumerate(tail)):
+            pairs = pairs[:-4] + [(SYSTEM_HEADER_ADDR + i, w) for i, (_, w) in enumerate(tail)]
+
+    # The encoder always ends with the 4-word system header; it shares Location 15's last pixels
+    warnings = []
+    header = {}
+    data_pairs = pairs
+    tail = pairs[-4:]
+    if len(tail) == 4 and [a for a, _ in tail] == [SYSTEM_HEADER_ADDR + i for i in range(4)]:
+        header = dict(tail)
+        data_pairs = pairs[:-4]
+    else:
+        warnings.append("System header (file count / boot index) not found at the end of the string.")
+
+    locations = {}
+    for address, word in data_pairs:
+        location, pixel = address >> 8, address & 0xFF
+        words = locations.setdefault(location, [])
+        if pixel >= len(words):
+            words.extend([None] * (pixel + 1 - len(words)))
+        words[pixel] = word
+
+    file_count = header.get(SYSTEM_HEADER_ADDR)
+    boot_index = header.get(SYSTEM_HEADER_ADDR + 1)
+    if file_count is not None and file_count > MAX_LOCATIONS:
+        warnings.append(f"File count word is {file_count}, above the 16 Location limit.")
+    if not type16:
+        warnings.append("8-bit strings decode on a best-effort basis; check the recovered designs.")
+
+    return DecodedImage(type16, pairs, locations, file_count, boot_index, warnings)
+
+
+def decode_paste(text, is_valid_word=None):
+    """
+    Parses a paste string into a DecodedImage. `is_valid_word(word)` is only used to
+    choose between ambiguous 8-bit decodings. Raises DecodeError.
+    """
+    type16, body = split_paste(text)
+    return _build_image(type16, _parse_body(type16, body, is_valid_word))
+
+
+def decode_chunks(texts, is_valid_word=None, deadline=None):
+    """
+    Decodes a paste split into chunks (ChunkedSink output, in order) as one image.
+    Chunks always cut between pairs, so their bodies join back into the full string.
+    With a `deadline` (a time.perf_counter() value), raises DecodeTimeout once it passes.
+    """
+    bodies = []
+    modes = set()
+    for text in texts:
+        type16, body = split_paste(text)
+        modes.add(type16)
+        bodies.append(body)
+    if len(modes) != 1:
+        raise DecodeError("Chunks mix 8-bit and 16-bit headers." if modes else "No chunks to decode.")
+    type16 = modes.pop()
+    return _build_image(type16, _parse_body(type16, "".join(bodies), is_valid_word, deadline))
+
+
+# --- Round-Trip Verification ---
+
+class VerifyReport:
+    """Outcome of verify_output. `mismatches` maps location -> [(pixel, expected, decoded)]."""
+
+    def __init__(self):
+        self.mismatches = {}
+        self.header_errors = []
+        self.checked_words = 0
+        self.checked_locations = 0
+        self.timed_out = False
+
+    @property
+    def ok(self):
+        return not self.mismatches and not self.header_errors and not self.timed_out
+
+
+def verify_output(texts, expected, boot_index, type16=True, skip_value=None, time_budget=DEFAULT_VERIFY_BUDGET):
+    """
+    Decodes the encoder output (a list of paste strings / chunks) and checks every address
+    and data word against `expected` ({location: [source words]}, one entry per file).
+    8-bit words are compared by their encoding, since 8-bit flip_byte is lossy above 0xFF.
+    Stops with report.timed_out once `time_budget` seconds have passed, including while
+    parsing. Raises DecodeError.
+    """
+    deadline = time.perf_counter() + time_budget
+    report = VerifyReport()
+    try:
+        image = decode_chunks(texts, deadline=deadline)
+    except DecodeTimeout:
+        report.timed_out = True
+        return report
+    if image.type16 != bool(type16):
+        raise DecodeError("Output header does not match the selected data mode.")
+
+    if image.file_count != len(expected):
+        report.header_errors.append(f"File count word is {image.file_count}, expected {len(expected)}.")
+    if image.boot_index != boot_index:
+        report.header_errors.append(f"Boot index word is {image.boot_index}, expected {boot_index}.")
+
+    enc = encoder_core.word_table(type16)
+    for location in sorted(set(expected) | set(image.locations)):
+        if time.perf_counter() > deadline:
+            report.timed_out = True
+            break
+
+        want = expected.get(location, [])
+        got = image.locations.get(location, [])
+        bad = []
+        for pixel in range(max(len(want), len(got))):
+            w = want[pixel] if pixel < len(want) else None
+            g = got[pixel] if pixel < len(got) else None
+            if g is None and w is not None and w == skip_value:
+                continue # Sparse output left this pixel out on purpose
+            if w is None or g is None or (g != w if type16 else enc[g] != enc[w]):
+                bad.append((pixel, w, g))
+        report.checked_words += len(want)
+        report.checked_locations += 1
+        if bad:
+            report.mismatches[location] = bad
+
+    return report
+
+
+# --- Designer Conversion ---
+
+def words_to_text(words):
+    """Source-file text (one 16-bit binary line per pixel), as the designer exports."""
+    return "\n".join("{:016b}".format(w) for w in words)
+
+
+def word_to_cell(word, reverse_char_map, reverse_color_map):
+    """Splits a design word into {'char', 'color'} the same way import_designer_file does."""
+    line = "{:016b}".format(word)
+    color = reverse_color_map.get(line[3:9], "black")
+    char = reverse_char_map.get(line[9:16], " ")
+    return {'char': char, 'color': color}
+
+
+def words_to_grid(words, reverse_char_map, reverse_color_map, grid_size=16):
+    cells = [word_to_cell(w, reverse_char_map, reverse_color_map) for w in words]
+    cells += [{'char': ' ', 'color': 'black'} for _ in range(grid_size * grid_size - len(cells))]
+    return [cells[r * grid_size:(r + 1) * grid_size] for r in range(grid_size)]
@@ -0,0 +1,199 @@
+# encode_cache.py
+"""
+Incremental re-encode cache for the EEPROM encoder.
+
+Each encoded Location segment is stored under a key built from the source
+content hash, the Location index, the data mode and the char map version, so
+a rebuild only re-encodes the files that actually changed. Entries live in an
+in-memory LRU and (optionally) on disk, where the oldest entries are evicted
+once the directory grows past its size limit.
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+CACHE_FORMAT = 2
+DEFAULT_MAX_DISK_BYTES = 32 * 1024 * 1024
+DEFAULT_MAX_MEMORY_ENTRIES = 256
+
+
+def default_cache_dir():
+    """Per-user cache location that survives restarts (and app updates)."""
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "BuildLogicPanelSuite", "encode_cache")
+
+
+def content_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def charmap_version(binary_chars):
+    """Stable hash of a CharToBin table; any edit to the map invalidates old segments."""
+    return hashlib.sha1(json.dumps(binary_chars, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+class EncodeCache:
+    def __init__(self, cache_dir=None, max_disk_bytes=DEFAULT_MAX_DISK_BYTES, max_memory_entries=DEFAULT_MAX_MEMORY_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_entries = max_memory_entries
+        self.memory = OrderedDict() # key -> (segment, nonzero_count, warnings, saved_chars)
+        self.file_stats = {} # path -> ((mtime_ns, size), digest) so unchanged files are not re-read
+        self.hits = 0
+        self.misses = 0
+        self._disk_bytes = None
+
+        if self.cache_dir:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+            except OSError:
+                self.cache_dir = None # Fall back to memory-only
+
+    # --- Keys ---
+    def make_key(self, digest, location, type16, charmap_ver, skip_value=None):
+        raw = f"{CACHE_FORMAT}:{digest}:{location}:{int(bool(type16))}:{charmap_ver}:{skip_value}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def source_digest(self, path_or_name, virtual_files):
+        """
+        Returns (digest, text). `text` is None when the digest came from the stat memo
+        (file untouched since the last build). Returns (None, None) for a missing file.
+        """
+        if path_or_name in virtual_files:
+            text = virtual_files[path_or_name]
+            return content_hash(text), text
+
+        try:
+            st = os.stat(path_or_name)
+        except OSError:
+            return None, None
+
+        stamp = (st.st_mtime_ns, st.st_size)
+        memo = self.file_stats.get(path_or_name)
+        if memo and memo[0] == stamp:
+            return memo[1], None
+
+        try:
+            with open(path_or_name, "r", encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            return None, None
+
+        digest = content_hash(text)
+        self.file_stats[path_or_name] = (stamp, digest)
+        return digest, text
+
+    # --- Lookup / Store ---
+    def get(self, key):
+        entry = self.memory.get(key)
+        if entry is not None:
+            self.memory.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        entry = self._disk_get(key)
+        if entry is not None:
+            self._memory_put(key, entry)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        return None
+
+    def put(self, key, segment, nonzero_count, warnings=(), saved_chars=0):
+        entry = (segment, nonzero_count, list(warnings), saved_chars)
+        self._memory_put(key, entry)
+        self._disk_put(key, entry)
+
+    def clear(self):
+        self.memory.clear()
+        self.file_stats.clear()
+        if not self.cache_dir: return
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+        self._disk_bytes = 0
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    # --- Memory Tier ---
+    def _memory_put(self, key, entry):
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_memory_entries:
+            self.memory.popitem(last=False)
+
+    # --- Disk Tier ---
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def _disk_get(self, key):
+        if not self.cache_dir: return None
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            os.utime(path, None) # Touch so eviction is least-recently-used
+            return (data["segment"], data["count"], data.get("warnings", []), data.get("saved", 0))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _disk_put(self, key, entry):
+        if not self.cache_dir: return
+        segment, count, warnings, saved = entry
+        path = self._entry_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"segment": segment, "count": count, "warnings": warnings, "saved": saved}, f, separators=(',', ':'))
+            os.replace(tmp_path, path) # Atomic, so parallel batch workers can share the directory
+            if self._disk_bytes is None:
+                self._disk_bytes = self.disk_usage()
+            else:
+                self._disk_bytes += os.path.getsize(path)
+        except OSError:
+            return
+
+        if self._disk_bytes > self.max_disk_bytes:
+            self._evict()
+
+    def disk_usage(self):
+        if not self.cache_dir: return 0
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".json"):
+                try:
+                    total += entry.stat().st_size
+                except OSError:
+                    pass
+        return total
+
+    def _evict(self):
+        """Deletes the least recently used entries until the cache is back under 75% of its limit."""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".json"):
+                try:
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+                except OSError:
+                    pass
+
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_disk_bytes * 0.75)
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total
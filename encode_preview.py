@@ -0,0 +1,63 @@
+# encode_preview.py
+"""
+Running size of the designer's encoded output, kept up to date while painting.
+
+Each cell maps to a fixed EEPROM address (its panel is its Location), and
+each cell costs the encoded chars of its address/data pair, the same way
+encoder_core.encode_location counts them. EncodedSizePreview is built once
+from the design's words. After that, a changed cell only swaps its old cost
+for its new one, so the size and the used-address count stay correct after
+every stroke without re-running the encoder.
+"""
+
+from array import array
+
+import encoder_core
+
+
+def design_addresses(rows, cols, size=16):
+    """EEPROM address of every cell, row-major (panels are Locations, numbered row-major across the wall)."""
+    panels_wide = cols // size
+    return [(((r // size) * panels_wide + c // size) << 8) | ((r % size) * size + c % size)
+            for r in range(rows) for c in range(cols)]
+
+
+class EncodedSizePreview:
+    def __init__(self, words, addresses, locations, type16=True, skip_value=None):
+        """`words` are the design's cell words (WordTable.model_words), `addresses` from design_addresses."""
+        self.type16 = type16
+        self.skip_value = skip_value
+        self.locations = locations
+        self.lengths = [len(chars) for chars in encoder_core.word_table(type16)] # Encoded chars per word
+        self.addr_lengths = array("B", (self.lengths[a] for a in addresses))
+        self.words = array("H", words)
+        self.fixed_chars = (len(encoder_core.HEADER_16BIT if type16 else encoder_core.HEADER_8BIT)
+                            + len(encoder_core.encode_system_header(locations, 0, type16)) + len(encoder_core.END_MARKER))
+        self.data_chars = 0
+        self.used = 0 # Non-zero words written, as encode_project counts them
+        for i, word in enumerate(self.words):
+            chars, used = self._cost(i, word)
+            self.data_chars += chars
+            self.used += used
+
+    def _cost(self, index, word):
+        """(encoded chars, used addresses) one cell adds; sparse-skipped words add nothing."""
+        if word == self.skip_value:
+            return 0, 0
+        return self.addr_lengths[index] + self.lengths[word], word != 0
+
+    def set_word(self, index, word):
+        """Updates one cell in O(1); returns True if its word changed."""
+        old = self.words[index]
+        if old == word: return False
+        old_chars, old_used = self._cost(index, old)
+        new_chars, new_used = self._cost(index, word)
+        self.data_chars += new_chars - old_chars
+        self.used += new_used - old_used
+        self.words[index] = word
+        return True
+
+    @property
+    def total_chars(self):
+        """Length of the paste string for this design alone (header, data, system header, end marker)."""
+        return self.fixed_chars + self.data_chars
@@ -0,0 +1,807 @@
+# encoder_core.py
+"""
+Tk-free EEPROM encoder used by the Panel Suite GUI and the batch compiler.
+
+Run directly to compile many projects at once:
+
+    python encoder_core.py level1.json level2.json --out build/
+    python encoder_core.py --files a.txt b.txt c.txt --out build/ --boot 1
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import encode_cache
+
+# --- CONSTANTS ---
+HEADER_16BIT = "#dHCAgA/"
+HEADER_8BIT = "XDCAgA/"
+END_MARKER = "=1"
+BASE71_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ!@$%?&<()"
+
+MAX_LOCATIONS = 16          # 4-bit Location field
+LOCATION_SIZE = 256         # 8-bit Pixel field
+TOTAL_ADDRESSES = MAX_LOCATIONS * LOCATION_SIZE
+MAX_WORD = (1 << 16) - 1    # 16-bit EEPROM word
+SYSTEM_HEADER_ADDR = (15 << 8) | 252  # Location 15, Pixel 252: file count, boot index, 2x reserved
+
+CHARMAP_FILE = "BinaryChars.json"
+
+DEFAULT_CHAR_MAP = {
+    " ": "0000000", "A": "1000000", "B": "1000001", "C": "1000010",
+    "D": "1000011", "E": "1000100", "F": "1000101", "G": "1000110",
+    "H": "1000111", "I": "1001000", "J": "1001001", "K": "1001010",
+    "L": "1001011", "M": "1001100", "N": "1001101", "O": "1001110",
+    "P": "1001111", "Q": "1010000", "R": "1010001", "S": "1010010",
+    "T": "1010011", "U": "1010100", "V": "1010101", "W": "1010110",
+    "X": "1010111", "Y": "1011000", "Z": "1011001", "0": "1100000",
+    "1": "1100001", "2": "1100010", "3": "1100011", "4": "1100100",
+    "5": "1100101", "6": "1100110", "7": "1100111", "8": "1101000",
+    "9": "1101001", ".": "1110000", "!": "1110001", "?": "1110010",
+    ":": "1110011", ",": "1110100", "'": "1110101", "-": "1110110",
+}
+
+
+class EncodeError(Exception):
+    """Raised when a source file cannot be encoded (bad token, value too high...)."""
+
+
+class EncodeCancelled(Exception):
+    """Raised when the `cancel` event passed to encode_project is set mid-run."""
+
+
+def _no_log(message, level="info"):
+    pass
+
+
+# --- Char Map ---
+
+def load_char_map(path=None):
+    """Loads the CharToBin table, falling back to the built-in defaults."""
+    if path is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), CHARMAP_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("CharToBin", {})
+    except Exception:
+        return dict(DEFAULT_CHAR_MAP)
+
+
+# --- Word Encoding ---
+
+def flip_byte(n, type16=True):
+    """Reverses the bit order of a word (16 bits, or 8 bits in 8-bit mode)."""
+    fmt = "{:016b}" if type16 else "{:08b}"
+    return int(fmt.format(n)[::-1], 2)
+
+
+def base71(n, type16=True):
+    """Encodes a word as base71 chars (3 chars in 16-bit mode, 2 in 8-bit mode)."""
+    if n == 0: return "00" + ("0" if type16 else "")
+    out = ""
+    while n > 0:
+        n, r = divmod(n, 71)
+        out = BASE71_DIGITS[r] + out
+    return out.rjust(2 + type16, "0")
+
+
+# Precomputed base71(flip_byte(n)) for every 16-bit word, built once per data mode.
+_WORD_TABLES = {}
+
+
+def _build_word_table(type16):
+    digits = BASE71_DIGITS
+    if type16:
+        # 16-bit reverse from two 8-bit reverses; every word fits in 3 base71 chars (71**3 > 65535)
+        rev8 = [int("{:08b}".format(n)[::-1], 2) for n in range(256)]
+        b71 = [digits[n // 5041] + digits[(n // 71) % 71] + digits[n % 71] for n in range(MAX_WORD + 1)]
+        return [b71[(rev8[n & 0xFF] << 8) | rev8[n >> 8]] for n in range(MAX_WORD + 1)]
+    # 8-bit mode reverses the word's natural bit length, so reuse the reference functions
+    return [base71(flip_byte(n, False), False) for n in range(MAX_WORD + 1)]
+
+
+def word_table(type16=True):
+    """Returns the 65536-entry table mapping a word to its encoded (flipped, base71) chars."""
+    table = _WORD_TABLES.get(bool(type16))
+    if table is None:
+        table = _WORD_TABLES[bool(type16)] = _build_word_table(bool(type16))
+    return table
+
+
+def encode_word(address, value, type16=True):
+    """Returns the address/data pair for a single EEPROM write."""
+    table = word_table(type16)
+    return table[address] + table[value]
+
+
+def calc_val(token, binary_chars):
+    """
+    Parses a source token into an integer word.
+    Accepts binary ("1110000001000000"), decimal, hex ("hFF"), a single mapped
+    character, or a "+" sum whose parts may be bit flags ("b3" = 1 << 2).
+    """
+    token = token.strip()
+    if not token: return 0
+    if all(c in "01" for c in token) and len(token) > 2: return int(token, 2)
+    if token.isdigit(): return int(token)
+    if token.lower().startswith("h"): return int(token[1:], 16)
+    if len(token) == 1 and token in binary_chars: return int(binary_chars[token], 2)
+    if "+" in token:
+        total = 0
+        for part in token.split("+"):
+            part = part.strip()
+            if not part: continue
+            if part.lower().startswith("b"): total += (1 << (int(part[1:]) - 1))
+            else: total += calc_val(part, binary_chars)
+        return total
+    raise ValueError(f"Unknown token: {token}")
+
+
+# --- Token Parser ---
+# Whole-token forms, tried in calc_val's order: binary (3+ digits), decimal, hex
+_TERM_RE = re.compile(r"(?P<bin>[01]{3,})|(?P<dec>[0-9]+)|(?P<hex>[hH][0-9a-fA-F]+)")
+_FLAG_RE = re.compile(r"[bB]([0-9]+)")
+DEFAULT_TOKEN_MEMO_SIZE = 4096
+
+
+class TokenError(ValueError):
+    """A token that cannot be parsed; `column` is 1-based within the token."""
+
+    def __init__(self, reason, column=1):
+        super().__init__(f"col {column}: {reason}")
+        self.reason = reason
+        self.column = column
+
+
+class TokenParser:
+    """
+    Compiled, memoized version of calc_val for one char map.
+    Common forms go through precompiled regexes; anything unusual falls back to
+    calc_val itself, so both always agree. Distinct tokens are parsed once and kept
+    in a bounded memo (oldest entries dropped first).
+    """
+
+    def __init__(self, binary_chars, max_entries=DEFAULT_TOKEN_MEMO_SIZE):
+        self.binary_chars = binary_chars
+        self.max_entries = max_entries
+        self.memo = {}
+        self.parsed = 0 # Distinct tokens actually compiled (memo misses)
+
+    def parse(self, token):
+        """Returns the word for a stripped token. Raises TokenError."""
+        value = self.memo.get(token)
+        if value is None:
+            value = self._compile(token)
+            self.parsed += 1
+            if len(self.memo) >= self.max_entries:
+                del self.memo[next(iter(self.memo))]
+            self.memo[token] = value
+        return value
+
+    def _term(self, token):
+        """Value of a "+"-free token, or None if it needs the calc_val fallback."""
+        m = _TERM_RE.fullmatch(token)
+        if m:
+            kind = m.lastgroup
+            if kind == "bin": return int(token, 2)
+            if kind == "dec": return int(token)
+            return int(token[1:], 16)
+        # calc_val checks the hex prefix before the char map, so a lone "h" is never a char
+        if len(token) == 1 and token in self.binary_chars and token not in "hH":
+            return int(self.binary_chars[token], 2)
+        return None
+
+    def _compile(self, token):
+        if not token: return 0
+
+        value = self._term(token)
+        if value is not None:
+            return value
+
+        if token[0] in "hH":
+            # calc_val treats anything with the hex prefix as hex, "+" included
+            try:
+                return int(token[1:], 16)
+            except ValueError as e:
+                raise TokenError(f"Invalid hex value '{token}' ({e})", 1)
+
+        if "+" in token and not (len(token) == 1 and token in self.binary_chars):
+            total = 0
+            pos = 0
+            for raw in token.split("+"):
+                column = pos + len(raw) - len(raw.lstrip()) + 1
+                pos += len(raw) + 1
+                part = raw.strip()
+                if not part: continue
+                if part[0] in "bB":
+                    m = _FLAG_RE.fullmatch(part)
+                    if m and int(m.group(1)) > 0:
+                        total += 1 << (int(m.group(1)) - 1)
+                        continue
+                    try:
+                        total += 1 << (int(part[1:]) - 1)
+                    except Exception as e:
+                        raise TokenError(f"Invalid bit flag '{part}' ({e})", column)
+                    continue
+                value = self._term(part)
+                if value is None:
+                    try:
+                        value = calc_val(part, self.binary_chars)
+                    except Exception as e:
+                        raise TokenError(str(e), column)
+                total += value
+            return total
+
+        try:
+            return calc_val(token, self.binary_chars)
+        except Exception as e:
+            raise TokenError(str(e), 1)
+
+
+# --- Location / Project Encoding ---
+
+def read_source_text(path_or_name, virtual_files):
+    """Returns the text of a virtual design or a file on disk, or None if the file is missing."""
+    if path_or_name in virtual_files:
+        return virtual_files[path_or_name]
+    try:
+        with open(path_or_name, "r", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def read_source(path_or_name, virtual_files):
+    """Returns the lines of a source file, or None if the file is missing."""
+    text = read_source_text(path_or_name, virtual_files)
+    return text.splitlines() if text is not None else None
+
+
+def source_display_name(path_or_name, virtual_files):
+    if path_or_name in virtual_files and not os.path.isabs(path_or_name):
+        return path_or_name
+    return os.path.basename(path_or_name) # Disk files, including ones held in a snapshot_sources copy
+
+
+def snapshot_sources(files_to_encode, virtual_files):
+    """
+    A copy of `virtual_files` plus the current text of every source file on disk, so an
+    encode and its verification read the same words even if a file is saved in between.
+    Missing files are left out and still report as missing.
+    """
+    snapshot = dict(virtual_files)
+    for path_or_name in files_to_encode:
+        if path_or_name not in snapshot:
+            text = read_source_text(path_or_name, virtual_files)
+            if text is not None:
+                snapshot[path_or_name] = text
+    return snapshot
+
+
+def iter_source_words(lines, location=0, binary_chars=None, name="", log=_no_log, parser=None):
+    """
+    Yields the word of each pixel of a source file, in address order, skipping blank and
+    comment lines and stopping after 256 pixels. Raises EncodeError on a bad line.
+    """
+    if parser is None:
+        parser = TokenParser(binary_chars)
+    parse = parser.parse
+    pixels = 0
+
+    for line_num, line in enumerate(lines):
+        if pixels >= LOCATION_SIZE:
+            log(f"WARN: File {location} ({name}) truncated after 256 addresses (Pixel 0xFF).", "warn")
+            break
+
+        clean_line = line.split("//")[0].strip()
+        if not clean_line or clean_line.startswith("#"):
+            continue # Skip empty/comment lines
+
+        try:
+            val = parse(clean_line)
+        except TokenError as e:
+            column = line.find(clean_line) + e.column
+            raise EncodeError(f"Error in {name} line {line_num+1}, col {column} ({clean_line}): {e.reason}")
+        if val > MAX_WORD:
+            raise EncodeError(f"Line {line_num+1}: Value {val} too high for 16-bit EEPROM word.")
+
+        pixels += 1
+        yield val
+
+
+def encode_location(lines, location, binary_chars, type16=True, name="", log=_no_log, skip_value=None, parser=None):
+    """
+    Encodes the lines of one source file into EEPROM Location `location`.
+    Sparse mode: words equal to `skip_value` keep their pixel address but are not emitted.
+    Pass a shared TokenParser to parse repeated tokens only once per run.
+    Returns (segment, nonzero_count, saved_chars). Raises EncodeError on a bad line.
+    """
+    table = word_table(type16)
+    parts = []
+    eeprom_address = location << 8
+    nonzero_count = 0
+    saved_chars = 0
+
+    for val in iter_source_words(lines, location, binary_chars, name, log, parser):
+        if val == skip_value:
+            saved_chars += len(table[eeprom_address]) + len(table[val])
+        else:
+            parts.append(table[eeprom_address])
+            parts.append(table[val])
+            if val != 0:
+                nonzero_count += 1
+        eeprom_address += 1
+
+    return "".join(parts), nonzero_count, saved_chars
+
+
+def project_source_words(files_to_encode, virtual_files, binary_chars):
+    """{location: [words]} for every file, as encode_project reads them (missing files -> [])."""
+    parser = TokenParser(binary_chars)
+    words = {}
+    for location, path_or_name in enumerate(files_to_encode):
+        lines = read_source(path_or_name, virtual_files)
+        name = source_display_name(path_or_name, virtual_files)
+        words[location] = list(iter_source_words(lines, location, binary_chars, name, parser=parser)) if lines is not None else []
+    return words
+
+
+def encode_system_header(num_files, boot_index, type16=True):
+    """Encodes the system header block: file count, boot index and two reserved words."""
+    return (encode_word(SYSTEM_HEADER_ADDR, num_files, type16)
+            + encode_word(SYSTEM_HEADER_ADDR + 1, boot_index, type16)
+            + encode_word(SYSTEM_HEADER_ADDR + 2, 0, type16)
+            + encode_word(SYSTEM_HEADER_ADDR + 3, 0, type16))
+
+
+class EncodeResult:
+    """The finished paste string plus the usage numbers shown on the dashboard."""
+
+    def __init__(self, output, total_written, file_counts, saved_chars=0):
+        self.output = output
+        self.total_written = total_written
+        self.file_counts = file_counts
+        self.saved_chars = saved_chars # Chars left out by sparse mode
+
+
+def _encode_location_cached(cache, path_or_name, virtual_files, location, binary_chars, type16, name, log, charmap_ver, skip_value, parser):
+    """Returns (segment, nonzero_count, saved_chars) from the cache, encoding (and storing) it on a miss. None if the file is missing."""
+    digest, text = cache.source_digest(path_or_name, virtual_files)
+    if digest is None:
+        return None
+
+    key = cache.make_key(digest, location, type16, charmap_ver, skip_value)
+    entry = cache.get(key)
+    if entry is not None:
+        segment, count, warnings, saved = entry
+        for message in warnings:
+            log(message, "warn")
+        return segment, count, saved
+
+    if text is None:
+        # Stat memo said "unchanged" but the segment was evicted; read it again
+        text = read_source_text(path_or_name, virtual_files)
+        if text is None:
+            return None
+
+    warnings = []
+
+    def capture(message, level="info"):
+        if level == "warn":
+            warnings.append(message)
+        log(message, level)
+
+    segment, count, saved = encode_location(text.splitlines(), location, binary_chars, type16, name, capture, skip_value, parser)
+    cache.put(key, segment, count, warnings, saved)
+    return segment, count, saved
+
+
+def encode_project(files_to_encode, virtual_files, binary_chars, type16=True, boot_index=0, log=_no_log, cache=None, sink=None, skip_value=None,
+                   progress=None, cancel=None):
+    """
+    Encodes every file in `files_to_encode` (file index == Location) into one paste string.
+    Missing files are skipped but still occupy their Location. Raises EncodeError.
+    With an encode_cache.EncodeCache, unchanged Locations are spliced in from the cache.
+    With a sink (see Output Sinks), each Location is written out as soon as it is encoded
+    and result.output is None.
+    With `skip_value` (sparse mode), data words equal to it are left out of the output.
+    `progress(done, total)` is called after each Location; setting the `cancel` event
+    (threading.Event) stops the run with EncodeCancelled before the next Location.
+    """
+    num_files = len(files_to_encode)
+    if num_files > MAX_LOCATIONS:
+        raise EncodeError(f"FATAL ERROR: Maximum number of save files is 16 (0-15), but {num_files} were selected.")
+    if not binary_chars:
+        raise EncodeError("BinaryChars.json not loaded. Cannot encode.")
+
+    own_sink = sink is None
+    if own_sink:
+        sink = StringSink()
+    sink.begin(HEADER_16BIT if type16 else HEADER_8BIT)
+
+    total_written = 0
+    saved_chars = 0
+    file_counts = []
+    parser = TokenParser(binary_chars) # Shared by every Location so each distinct token is parsed once
+    charmap_ver = None
+    if cache is not None:
+        charmap_ver = encode_cache.charmap_version(binary_chars)
+        cache.reset_stats()
+
+    for location, path_or_name in enumerate(files_to_encode):
+        if cancel is not None and cancel.is_set():
+            raise EncodeCancelled(f"Encoding cancelled before Location {location}.")
+        if progress is not None and location:
+            progress(location, num_files)
+
+        name = source_display_name(path_or_name, virtual_files)
+        log(f"Encoding File {location} (Location {location}) : {name}...", "info")
+
+        if cache is None:
+            lines = read_source(path_or_name, virtual_files)
+            if lines is None:
+                log(f"File not found: {name}. Skipping.", "error")
+                file_counts.append(0)
+                continue
+            segment, count, saved = encode_location(lines, location, binary_chars, type16, name, log, skip_value, parser)
+        else:
+            found = _encode_location_cached(cache, path_or_name, virtual_files, location, binary_chars, type16, name, log, charmap_ver, skip_value, parser)
+            if found is None:
+                log(f"File not found: {name}. Skipping.", "error")
+                file_counts.append(0)
+                continue
+            segment, count, saved = found
+
+        sink.write(segment)
+        file_counts.append(count)
+        total_written += count
+        saved_chars += saved
+
+    if progress is not None:
+        progress(num_files, num_files)
+
+    log(f"Parsed {parser.parsed} distinct token(s).", "info")
+    if skip_value is not None:
+        log(f"Sparse output: skipped words equal to {skip_value}, saving {saved_chars} chars.", "info")
+    if cache is not None:
+        log(f"Encode cache: {cache.hits} location(s) reused, {cache.misses} re-encoded.", "info")
+
+    log(f"Writing system header to high addresses (0x{SYSTEM_HEADER_ADDR:04X} to 0xFFFF)...", "info")
+    sink.write(encode_system_header(num_files, boot_index, type16))
+    sink.end(END_MARKER)
+
+    return EncodeResult(sink.getvalue() if own_sink else None, total_written, file_counts, saved_chars)
+
+
+# --- Output Sinks ---
+# encode_project calls begin(header), then write(pairs) once per Location, then end(marker).
+
+class StringSink:
+    """Collects the whole paste string in memory (the clipboard path)."""
+
+    def __init__(self):
+        self.parts = []
+
+    def begin(self, header):
+        self.parts = [header]
+
+    def write(self, pairs):
+        self.parts.append(pairs)
+
+    def end(self, marker):
+        self.parts.append(marker)
+
+    def getvalue(self):
+        return "".join(self.parts)
+
+
+class StreamSink:
+    """Writes each piece straight to an open text stream (a file or sys.stdout)."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.chars_written = 0
+
+    def begin(self, header):
+        self._emit(header)
+
+    def write(self, pairs):
+        self._emit(pairs)
+
+    def end(self, marker):
+        self._emit(marker)
+        self.stream.flush()
+
+    def _emit(self, text):
+        self.stream.write(text)
+        self.stream.flush()
+        self.chars_written += len(text)
+
+
+def pair_width(type16=True):
+    """Chars per address/data pair, or None in 8-bit mode where word widths vary (2 or 3 chars)."""
+    return 6 if type16 else None
+
+
+def min_chunk_chars(type16=True):
+    """
+    Smallest `chunk_chars` a ChunkedSink accepts: header and end marker plus one pair
+    in 16-bit mode, or plus a full Location of the widest pairs in 8-bit mode.
+    """
+    table = word_table(type16)
+    fixed = len(HEADER_16BIT if type16 else HEADER_8BIT) + len(END_MARKER)
+    if type16:
+        return fixed + pair_width(True)
+    widest = max(len(table[a]) for a in range(MAX_LOCATIONS * LOCATION_SIZE)) + max(len(w) for w in table)
+    return fixed + LOCATION_SIZE * widest
+
+
+class ChunkedSink:
+    """
+    Splits the output into paste-sized chunks of at most `chunk_chars`, each a complete
+    paste string (header + pairs + end marker). Chunks are only cut between pairs; in
+    8-bit mode, where pair widths vary, they are cut between Locations instead, so
+    `chunk_chars` must be at least min_chunk_chars(type16) (EncodeError otherwise).
+    `emit(index, text)` is called for every finished chunk.
+    """
+
+    def __init__(self, emit, chunk_chars, type16=True):
+        minimum = min_chunk_chars(type16)
+        if chunk_chars < minimum:
+            raise EncodeError(f"Chunk size {chunk_chars} is too small; {'16' if type16 else '8'}-bit output needs at least {minimum} chars per chunk.")
+        self.emit = emit
+        self.chunk_chars = chunk_chars
+        self.width = pair_width(type16)
+        self.header = ""
+        self.marker = END_MARKER
+        self.buffer = []
+        self.buffered = 0
+        self.count = 0
+
+    def begin(self, header):
+        self.header = header
+        self.buffer = []
+        self.buffered = 0
+        self.count = 0
+
+    def write(self, pairs):
+        budget = self.chunk_chars - len(self.header) - len(self.marker)
+        if self.width:
+            budget -= budget % self.width
+            pos = 0
+            while pos < len(pairs):
+                take = min(len(pairs) - pos, budget - self.buffered)
+                self._add(pairs[pos:pos + take])
+                pos += take
+                if self.buffered >= budget:
+                    self._flush()
+        else:
+            if self.buffered and self.buffered + len(pairs) > budget:
+                self._flush()
+            self._add(pairs)
+
+    def end(self, marker):
+        self.marker = marker
+        if self.buffer:
+            self._flush()
+
+    def _add(self, text):
+        self.buffer.append(text)
+        self.buffered += len(text)
+
+    def _flush(self):
+        self.emit(self.count, self.header + "".join(self.buffer) + self.marker)
+        self.count += 1
+        self.buffer = []
+        self.buffered = 0
+
+
+def chunk_file_path(out_path, index):
+    """build/level.dat, 2 -> build/level.part03.dat"""
+    root, ext = os.path.splitext(out_path)
+    return f"{root}.part{index + 1:02d}{ext}"
+
+
+def encode_to_file(out_path, files_to_encode, virtual_files, binary_chars, type16=True, boot_index=0, log=_no_log, cache=None, chunk_chars=0, skip_value=None,
+                   progress=None, cancel=None):
+    """
+    Streams the encoded project to `out_path`, or to numbered part files when
+    `chunk_chars` is set. Partial output is removed if encoding fails.
+    Returns (EncodeResult, written_paths).
+    """
+    written = []
+    try:
+        if chunk_chars:
+            def emit(index, text):
+                path = chunk_file_path(out_path, index)
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(text)
+                written.append(path)
+
+            sink = ChunkedSink(emit, chunk_chars, type16)
+            result = encode_project(files_to_encode, virtual_files, binary_chars, type16, boot_index, log, cache, sink, skip_value,
+                                    progress, cancel)
+        else:
+            with open(out_path, "w", encoding="utf-8") as f:
+                written.append(out_path)
+                result = encode_project(files_to_encode, virtual_files, binary_chars, type16, boot_index, log, cache, StreamSink(f), skip_value,
+                                        progress, cancel)
+    except Exception:
+        for path in written:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        raise
+    return result, written
+
+
+# --- Batch Compiler ---
+
+def load_project_file(path):
+    """Reads a project saved by the GUI's save_project (.json or binary .blp) into encoder inputs."""
+    import project_file # Imported here: project_file itself imports this module
+    if project_file.is_binary_project(path):
+        project_data = project_file.load(path)
+        project_data["virtual_files"] = project_data["virtual_files"].close() # Plain dict; jobs go to worker processes
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            project_data = json.load(f)
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    virtual_files = project_data.get("virtual_files", {})
+    files = []
+    for p in project_data.get("files_to_encode", []):
+        # Relative source paths are resolved against the project file
+        if p not in virtual_files and not os.path.isabs(p):
+            p = os.path.join(base_dir, p)
+        files.append(p)
+
+    return {
+        "files_to_encode": files,
+        "virtual_files": virtual_files,
+        "binary_chars": project_data.get("binary_chars"),
+        "is_16bit": project_data.get("is_16bit", True),
+    }
+
+
+def compile_job(job):
+    """
+    Process-pool worker: encodes one project and writes its output file.
+    Returns (name, out_path, error, messages). Must stay a top-level function so it can be pickled.
+    """
+    name, out_path, project = job["name"], job["out_path"], job["project"]
+    messages = []
+
+    def log(message, level="info"):
+        if level != "info":
+            messages.append(f"[{level.upper()}] {message}")
+
+    try:
+        cache = encode_cache.EncodeCache(job["cache_dir"]) if job["cache_dir"] else None
+        _, written = encode_to_file(out_path, project["files_to_encode"], project["virtual_files"],
+                                    project["binary_chars"], project["is_16bit"], job["boot_index"], log, cache,
+                                    job["chunk_chars"], job["skip_value"])
+        return name, ", ".join(written), None, messages
+    except Exception as e:
+        return name, out_path, str(e), messages
+
+
+def build_jobs(args, default_chars):
+    jobs = []
+    used_names = set()
+
+    def make_job(name, project):
+        return {
+            "name": name,
+            "out_path": os.path.join(args.out, name + args.ext),
+            "project": project,
+            "boot_index": args.boot,
+            "cache_dir": args.cache,
+            "chunk_chars": args.chunk,
+            "skip_value": calc_val(args.sparse, project["binary_chars"]) if args.sparse is not None else None,
+        }
+
+    def unique_name(stem):
+        name, i = stem, 1
+        while name in used_names:
+            name = f"{stem}_{i}"
+            i += 1
+        used_names.add(name)
+        return name
+
+    for path in args.projects:
+        project = load_project_file(path)
+        if not project["binary_chars"]:
+            project["binary_chars"] = default_chars
+        if args.bit8:
+            project["is_16bit"] = False
+        jobs.append(make_job(unique_name(os.path.splitext(os.path.basename(path))[0]), project))
+
+    for file_list in args.files or []:
+        project = {
+            "files_to_encode": [os.path.abspath(p) for p in file_list],
+            "virtual_files": {},
+            "binary_chars": default_chars,
+            "is_16bit": not args.bit8,
+        }
+        jobs.append(make_job(unique_name(os.path.splitext(os.path.basename(file_list[0]))[0]), project))
+
+    return jobs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-compile BuildLogic EEPROM images.")
+    parser.add_argument("projects", nargs="*", help="Project files (.json or .blp) saved by the Panel Suite.")
+    parser.add_argument("--files", nargs="+", action="append", metavar="TXT",
+                        help="Source .txt files forming one image (Location 0, 1, ...). Repeat for more images.")
+    parser.add_argument("--out", default=".", help="Output directory (one file per project).")
+    parser.add_argument("--ext", default=".dat", help="Output file extension.")
+    parser.add_argument("--boot", type=int, default=0, help="Boot file index written to 0xFFFD.")
+    parser.add_argument("--8bit", dest="bit8", action="store_true", help="Force 8-bit data mode.")
+    parser.add_argument("--charmap", help="CharToBin JSON used when a project has no embedded map.")
+    parser.add_argument("--cache", nargs="?", const=encode_cache.default_cache_dir(), default=None, metavar="DIR",
+                        help="Reuse unchanged Locations from an on-disk encode cache (default dir if no DIR given).")
+    parser.add_argument("--chunk", type=int, default=0, metavar="CHARS",
+                        help="Split each output into paste-sized part files of at most CHARS characters "
+                             f"(at least {min_chunk_chars(True)}, or {min_chunk_chars(False)} with --8bit).")
+    parser.add_argument("--sparse", nargs="?", const="0", default=None, metavar="FILL",
+                        help="Sparse output: leave out data words equal to FILL (default 0, any source token).")
+    parser.add_argument("--stdout", action="store_true", help="Stream a single project to stdout instead of a file (not with --chunk).")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes (default: CPU count).")
+    args = parser.parse_args(argv)
+
+    if not args.projects and not args.files:
+        parser.error("nothing to compile: pass project files and/or --files groups")
+    if args.chunk and args.stdout:
+        parser.error("--chunk cannot be used with --stdout")
+    if args.chunk and args.chunk < min_chunk_chars(not args.bit8):
+        parser.error(f"--chunk must be at least {min_chunk_chars(not args.bit8)} chars")
+
+    jobs = build_jobs(args, load_char_map(args.charmap))
+
+    if args.stdout:
+        if len(jobs) != 1:
+            parser.error("--stdout needs exactly one project")
+        job = jobs[0]
+        project = job["project"]
+        cache = encode_cache.EncodeCache(job["cache_dir"]) if job["cache_dir"] else None
+
+        def log(message, level="info"):
+            if level != "info":
+                print(f"[{level.upper()}] {message}", file=sys.stderr)
+
+        try:
+            encode_project(project["files_to_encode"], project["virtual_files"], project["binary_chars"],
+                           project["is_16bit"], job["boot_index"], log, cache, StreamSink(sys.stdout), job["skip_value"])
+        except EncodeError as e:
+            print(f"[ERROR] {e}", file=sys.stderr)
+            return 1
+        sys.stdout.write("\n")
+        return 0
+
+    os.makedirs(args.out, exist_ok=True)
+
+    failures = 0
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        for name, out_path, error, messages in pool.map(compile_job, jobs):
+            for message in messages:
+                print(f"  {name}: {message}")
+            if error:
+                failures += 1
+                print(f"[ERROR] {name}: {error}")
+            else:
+                print(f"[OK]    {name} -> {out_path}")
+
+    print(f"Compiled {len(jobs) - failures}/{len(jobs)} projects.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,277 @@
+# grid_canvas.py
+"""
+Single-canvas renderer for the Pixel Designer grid.
+
+Every cell is one rectangle and one text item on a tk.Canvas, addressed by
+index (r * cols + c), so drawing a cell is two itemconfigure calls and Tk
+only repaints the area that changed. Pointer events are mapped to cells
+arithmetically instead of through 256 widgets with their own bindings.
+Drag motion is coalesced to one update per frame, and cells skipped by a fast
+drag are filled in along a Bresenham line.
+Walls bigger than the view keep a minimum cell size and scroll.
+"""
+
+import tkinter as tk
+
+GRID_BG = "#202020"  # Shows through the gaps between cells
+CELL_GAP = 1         # Pixels between neighbouring cells
+MIN_FONT_SIZE = 6
+MIN_CELL_SIZE = 14   # Below this the wall scrolls instead of shrinking
+PANEL_SIZE = 16      # Divider lines are drawn between 16x16 panels
+PANEL_LINE_COLOR = "#606060"
+DRAG_FRAME_MS = 16   # Drag motion is handled at most once per frame (~60 Hz)
+
+
+def line_cells(r1, c1, r2, c2):
+    """Cells on the Bresenham line from (r1, c1) to (r2, c2), both ends included."""
+    dr, dc = abs(r2 - r1), abs(c2 - c1)
+    sr = 1 if r1 < r2 else -1
+    sc = 1 if c1 < c2 else -1
+    err = dr - dc
+    cells = []
+    r, c = r1, c1
+    while True:
+        cells.append((r, c))
+        if r == r2 and c == c2: return cells
+        e2 = 2 * err
+        if e2 > -dc:
+            err -= dc
+            r += sr
+        if e2 < dr:
+            err += dr
+            c += sc
+
+
+class GridCanvas(tk.Canvas):
+    """
+    Callbacks receive cell coordinates: on_down(r, c), on_drag(r, c), on_up(r, c),
+    on_hover(r, c) and on_leave(). Drag/up are only reported inside the grid;
+    on_drag fires once per new cell, including cells the pointer jumped over.
+    """
+
+    def __init__(self, master, rows, cols, on_down=None, on_drag=None, on_up=None, on_hover=None, on_leave=None,
+                 font_family="Arial", **kwargs):
+        kwargs.setdefault("confine", True)
+        kwargs.setdefault("bg", GRID_BG)
+        kwargs.setdefault("highlightthickness", 0)
+        super().__init__(master, **kwargs)
+        self.on_down = on_down
+        self.on_drag = on_drag
+        self.on_up = on_up
+        self.on_hover = on_hover
+        self.on_leave = on_leave
+        self.font_family = font_family
+
+        self.rows = 0
+        self.cols = 0
+        self.rects = [] # Item IDs by cell index
+        self.texts = []
+        self.cell_size = 1.0
+        self.cursor_cell = None
+        self.selection_cells = None # (min_r, min_c, max_r, max_c)
+        self.hover_cell = None
+        self.drag_cell = None # Last cell reported to on_drag (or on_down) in the current drag
+        self._drag_point = None # Latest B1-Motion position not yet handled
+        self._drag_job = None
+        self._layout_job = None
+
+        self.bind("<Configure>", self._on_configure)
+        self.bind("<Button-1>", self._on_button_down)
+        self.bind("<B1-Motion>", self._on_button_drag)
+        self.bind("<ButtonRelease-1>", self._on_button_up)
+        self.bind("<Motion>", self._on_motion)
+        self.bind("<Leave>", self._on_leave)
+        self.bind("<MouseWheel>", self._on_wheel)
+        self.bind("<Shift-MouseWheel>", self._on_wheel)
+        self.bind("<Button-4>", self._on_wheel) # X11 wheel
+        self.bind("<Button-5>", self._on_wheel)
+
+        self.build(rows, cols)
+
+    # --- Items / Layout ---
+    def build(self, rows, cols):
+        """(Re)creates the cell items for a rows x cols grid. Cells start blank."""
+        self.delete("all")
+        self.rows, self.cols = rows, cols
+        self.rects = []
+        self.texts = []
+        for _ in range(rows * cols):
+            self.rects.append(self.create_rectangle(0, 0, 0, 0, width=0, fill=GRID_BG, tags=("cell_rect",)))
+            self.texts.append(self.create_text(0, 0, text="", tags=("cell_text",)))
+
+        # Panel dividers on multi-panel walls
+        for _ in range(PANEL_SIZE, cols, PANEL_SIZE):
+            self.create_line(0, 0, 0, 0, width=2, fill=PANEL_LINE_COLOR, tags=("panel_line", "panel_col"))
+        for _ in range(PANEL_SIZE, rows, PANEL_SIZE):
+            self.create_line(0, 0, 0, 0, width=2, fill=PANEL_LINE_COLOR, tags=("panel_line", "panel_row"))
+
+        # Overlays sit above every cell
+        self.selection_item = self.create_rectangle(0, 0, 0, 0, width=2, outline="", state="hidden")
+        self.cursor_item = self.create_rectangle(0, 0, 0, 0, width=1, outline="", state="hidden")
+        self.cursor_cell = None
+        self.selection_cells = None
+        self.hover_cell = None
+        self.layout()
+
+    def layout(self):
+        """Positions every item for the current canvas size."""
+        self._layout_job = None
+        width, height = max(self.winfo_width(), 1), max(self.winfo_height(), 1)
+        if width <= 1 and height <= 1: # Not mapped yet; use the requested size
+            width, height = int(self.cget("width")), int(self.cget("height"))
+        self.cell_size = self.fit_cell_size(width, height)
+        self.configure(scrollregion=(0, 0, self.cols * self.cell_size, self.rows * self.cell_size))
+
+        coords = self.coords
+        for r in range(self.rows):
+            for c in range(self.cols):
+                i = r * self.cols + c
+                x0, y0, x1, y1 = self.cell_bounds(r, c)
+                coords(self.rects[i], x0 + CELL_GAP, y0 + CELL_GAP, x1 - CELL_GAP, y1 - CELL_GAP)
+                coords(self.texts[i], (x0 + x1) / 2, (y0 + y1) / 2)
+
+        font_size = max(MIN_FONT_SIZE, int(self.cell_size * 0.45))
+        self.itemconfigure("cell_text", font=(self.font_family, font_size, "bold"))
+
+        full_w, full_h = self.cols * self.cell_size, self.rows * self.cell_size
+        for n, item in enumerate(self.find_withtag("panel_col"), 1):
+            x = n * PANEL_SIZE * self.cell_size
+            coords(item, x, 0, x, full_h)
+        for n, item in enumerate(self.find_withtag("panel_row"), 1):
+            y = n * PANEL_SIZE * self.cell_size
+            coords(item, 0, y, full_w, y)
+
+        if self.cursor_cell:
+            self.coords(self.cursor_item, *self._inset(self.cell_bounds(*self.cursor_cell)))
+        if self.selection_cells:
+            self._place_selection()
+
+    def _on_configure(self, event):
+        if self._layout_job:
+            self.after_cancel(self._layout_job)
+        self._layout_job = self.after_idle(self.layout)
+
+    def fit_cell_size(self, width, height):
+        """Square cell size that fits the whole grid in width x height, but never below MIN_CELL_SIZE."""
+        return max(min(width / self.cols, height / self.rows), MIN_CELL_SIZE)
+
+    def cell_bounds(self, r, c):
+        size = self.cell_size
+        return (c * size, r * size, (c + 1) * size, (r + 1) * size)
+
+    def _inset(self, bounds):
+        x0, y0, x1, y1 = bounds
+        return (x0 + CELL_GAP, y0 + CELL_GAP, x1 - CELL_GAP, y1 - CELL_GAP)
+
+    # --- Drawing ---
+    def draw_cell(self, r, c, fill, text_color, text):
+        i = r * self.cols + c
+        self.itemconfigure(self.rects[i], fill=fill)
+        self.itemconfigure(self.texts[i], text=text, fill=text_color)
+
+    def show_cursor(self, r, c, color, width=1):
+        self.cursor_cell = (r, c)
+        self.coords(self.cursor_item, *self._inset(self.cell_bounds(r, c)))
+        self.itemconfigure(self.cursor_item, outline=color, width=width, state="normal")
+
+    def set_cursor_color(self, color):
+        self.itemconfigure(self.cursor_item, outline=color)
+
+    def hide_cursor(self):
+        self.cursor_cell = None
+        self.itemconfigure(self.cursor_item, state="hidden")
+
+    def show_selection(self, r1, c1, r2, c2, color):
+        self.selection_cells = (min(r1, r2), min(c1, c2), max(r1, r2), max(c1, c2))
+        self._place_selection()
+        self.itemconfigure(self.selection_item, outline=color, state="normal")
+
+    def _place_selection(self):
+        min_r, min_c, max_r, max_c = self.selection_cells
+        x0, y0, _, _ = self.cell_bounds(min_r, min_c)
+        _, _, x1, y1 = self.cell_bounds(max_r, max_c)
+        self.coords(self.selection_item, x0 + 1, y0 + 1, x1 - 1, y1 - 1)
+
+    def hide_selection(self):
+        self.selection_cells = None
+        self.itemconfigure(self.selection_item, state="hidden")
+
+    # --- Hit Testing / Events ---
+    def cell_at(self, x, y):
+        """(r, c) under widget point (x, y) (scroll offset applied), or None outside the grid."""
+        x, y = self.canvasx(x), self.canvasy(y)
+        if x < 0 or y < 0:
+            return None
+        r, c = int(y // self.cell_size), int(x // self.cell_size)
+        if r >= self.rows or c >= self.cols:
+            return None
+        return (r, c)
+
+    def _on_button_down(self, event):
+        self._cancel_drag()
+        cell = self.cell_at(event.x, event.y)
+        self.drag_cell = cell
+        if cell and self.on_down:
+            self.on_down(*cell)
+
+    def _on_button_drag(self, event):
+        # Only remember the position; all motion within one frame is handled together
+        self._drag_point = (event.x, event.y)
+        if self._drag_job is None:
+            self._drag_job = self.after(DRAG_FRAME_MS, self._flush_drag)
+
+    def _flush_drag(self):
+        self._drag_job = None
+        if self._drag_point is None: return
+        cell = self.cell_at(*self._drag_point) # The pointer is grabbed, so x/y can leave the canvas
+        self._drag_point = None
+        if cell is None:
+            self.drag_cell = None # Re-entering starts a new segment instead of a line across the gap
+            return
+        if cell == self.drag_cell: return
+
+        start, self.drag_cell = self.drag_cell, cell
+        path = line_cells(*start, *cell)[1:] if start else [cell]
+        if self.on_drag:
+            for r, c in path:
+                self.on_drag(r, c)
+
+    def _cancel_drag(self):
+        if self._drag_job:
+            self.after_cancel(self._drag_job)
+            self._drag_job = None
+        self._drag_point = None
+
+    def _on_button_up(self, event):
+        if self._drag_job: # Handle the last motion before the release
+            self.after_cancel(self._drag_job)
+            self._flush_drag()
+        self.drag_cell = None
+        cell = self.cell_at(event.x, event.y)
+        if cell and self.on_up:
+            self.on_up(*cell)
+
+    def _on_motion(self, event):
+        cell = self.cell_at(event.x, event.y)
+        if cell == self.hover_cell:
+            return
+        self.hover_cell = cell
+        if cell is None:
+            if self.on_leave: self.on_leave()
+        elif self.on_hover:
+            self.on_hover(*cell)
+
+    def _on_leave(self, event):
+        self.hover_cell = None
+        if self.on_leave:
+            self.on_leave()
+
+    def _on_wheel(self, event):
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            step = -1
+        else:
+            step = 1
+        if event.state & 0x0001: # Shift scrolls sideways
+            self.xview_scroll(step, "units")
+        else:
+            self.yview_scroll(step, "units")
@@ -0,0 +1,152 @@
+# grid_history.py
+"""
+Undo/redo for the Pixel Designer, stored as per-cell deltas.
+
+An edit is bracketed by begin() and commit(). begin() takes a byte copy of
+the GridModel, and commit() keeps only the cells that changed: their indexes
+plus the old and new palette/char bytes. A drag stroke or a full-grid
+transform is therefore one entry of a few bytes per changed cell. Edits that
+change the grid size keep both models whole. The byte and entry caps cover
+the undo and redo stacks together; past them, the oldest undo entries are
+dropped first, then the redo entries furthest ahead.
+"""
+
+from array import array
+
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 500
+
+
+class CellDelta:
+    """Changed cells of one edit on a fixed-size grid."""
+
+    def __init__(self, label, indexes, old_colors, old_chars, new_colors, new_chars):
+        self.label = label
+        self.indexes = indexes
+        self.old = (old_colors, old_chars)
+        self.new = (new_colors, new_chars)
+
+    @property
+    def size(self):
+        return self.indexes.itemsize * len(self.indexes) + 4 * len(self.indexes)
+
+    def apply(self, model, undo):
+        colors, chars = self.old if undo else self.new
+        mc, mh = model.colors, model.chars
+        for i, idx in enumerate(self.indexes):
+            mc[idx] = colors[i]
+            mh[idx] = chars[i]
+        return model, self.indexes
+
+
+class ResizeEdit:
+    """An edit that changed the grid size (wall resize, rotating a wall); keeps both models."""
+
+    def __init__(self, label, before, after):
+        self.label = label
+        self.before = before
+        self.after = after
+
+    @property
+    def size(self):
+        return 2 * (len(self.before.colors) + len(self.after.colors))
+
+    def apply(self, model, undo):
+        return (self.before if undo else self.after).copy(), None
+
+
+def diff(label, before, after):
+    """Entry for the change from `before` to `after`, or None if nothing changed."""
+    if (before.rows, before.cols) != (after.rows, after.cols):
+        return ResizeEdit(label, before, after.copy())
+    if before.colors == after.colors and before.chars == after.chars:
+        return None
+
+    bc, bh, ac, ah = before.colors, before.chars, after.colors, after.chars
+    indexes = array("H" if len(ac) <= 0x10000 else "I")
+    width = after.cols
+    for start in range(0, len(ac), width):
+        end = start + width
+        if bc[start:end] == ac[start:end] and bh[start:end] == ah[start:end]:
+            continue # Unchanged rows are skipped with one slice compare
+        indexes.extend(i for i in range(start, end) if bc[i] != ac[i] or bh[i] != ah[i])
+
+    return CellDelta(label, indexes,
+                     bytes(bc[i] for i in indexes), bytes(bh[i] for i in indexes),
+                     bytes(ac[i] for i in indexes), bytes(ah[i] for i in indexes))
+
+
+class GridHistory:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.undo_stack = []
+        self.redo_stack = []
+        self.bytes_used = 0
+        self._before = None
+        self._label = None
+
+    # --- Recording ---
+    def begin(self, model, label):
+        """Starts an edit. Any edit still open (e.g. a stroke released outside the grid) is committed first."""
+        if self._before is not None:
+            self.commit(model)
+        self._before = model.copy()
+        self._label = label
+
+    def commit(self, model):
+        """Ends the open edit; returns True if it changed anything."""
+        if self._before is None:
+            return False
+        entry = diff(self._label, self._before, model)
+        self._before = None
+        if entry is None:
+            return False
+
+        self.undo_stack.append(entry)
+        self.bytes_used += entry.size
+        for old in self.redo_stack:
+            self.bytes_used -= old.size
+        self.redo_stack.clear()
+        self._evict()
+        return True
+
+    @property
+    def recording(self):
+        return self._before is not None
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.bytes_used = 0
+        self._before = None
+
+    def _evict(self):
+        """Drops the oldest undo entries, then the furthest redo entries, until both stacks fit the caps."""
+        while self.undo_stack and (self.bytes_used > self.max_bytes or len(self.undo_stack) + len(self.redo_stack) > self.max_entries):
+            self.bytes_used -= self.undo_stack.pop(0).size
+        while self.redo_stack and (self.bytes_used > self.max_bytes or len(self.redo_stack) > self.max_entries):
+            self.bytes_used -= self.redo_stack.pop(0).size # redo_stack[0] is the last step forward
+
+    # --- Undo / Redo ---
+    def undo(self, model):
+        """
+        Reverts the newest edit. Returns (model, changed_indexes, label), where
+        changed_indexes is None when the whole grid (or its size) changed, or
+        None if there is nothing to undo.
+        """
+        self.commit(model)
+        return self._step(model, self.undo_stack, self.redo_stack, True)
+
+    def redo(self, model):
+        self.commit(model)
+        return self._step(model, self.redo_stack, self.undo_stack, False)
+
+    def _step(self, model, source, target, undo):
+        if not source:
+            return None
+        entry = source.pop()
+        target.append(entry)
+        self._evict()
+        model, changed = entry.apply(model, undo)
+        return model, changed, entry.label
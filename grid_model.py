@@ -0,0 +1,335 @@
+# grid_model.py
+"""
+Compact storage for a Pixel Designer grid.
+
+A GridModel keeps two bytearrays, one palette index and one char code per
+cell (row-major), instead of a list of {'char', 'color'} dicts. Copies, region
+views and RLE passes work on bytes, and converting to/from the dict format
+keeps old projects loading.
+"""
+
+from operator import itemgetter
+
+# Palette order (index 0 is the blank color); matches COLOR_MAP in the app
+PALETTE = ("black", "white", "gray", "red", "green", "blue", "yellow", "magenta", "cyan",
+           "bright_red", "bright_green", "bright_blue", "dark_red", "dark_green", "dark_blue")
+PALETTE_INDEX = {name: i for i, name in enumerate(PALETTE)}
+
+BLANK_CHAR = " "
+
+# Char codes are interned once per process and shared by every model, so codes
+# stay comparable between grids, clipboards and undo states (code 0 is blank)
+_CHARS = [BLANK_CHAR]
+_CHAR_CODES = {BLANK_CHAR: 0}
+
+
+def color_code(name):
+    """Palette index of a color name; unknown names fall back to black, as imports do."""
+    return PALETTE_INDEX.get(name, 0)
+
+
+def char_code(char):
+    code = _CHAR_CODES.get(char)
+    if code is None:
+        if len(_CHARS) > 0xFF:
+            raise ValueError("More than 256 distinct characters in use.")
+        code = len(_CHARS)
+        _CHARS.append(char)
+        _CHAR_CODES[char] = code
+    return code
+
+
+def char_of(code):
+    return _CHARS[code]
+
+
+def char_count():
+    """Number of char codes interned so far (valid codes are 0..char_count() - 1)."""
+    return len(_CHARS)
+
+
+class GridModel:
+    def __init__(self, rows, cols, colors=None, chars=None):
+        self.rows = rows
+        self.cols = cols
+        self.colors = colors if colors is not None else bytearray(rows * cols)
+        self.chars = chars if chars is not None else bytearray(rows * cols)
+
+    # --- Conversion ---
+    @classmethod
+    def from_dicts(cls, grid):
+        """Builds a model from the legacy [[{'char', 'color'}]] format."""
+        rows = len(grid)
+        cols = len(grid[0]) if rows else 0
+        model = cls(rows, cols)
+        i = 0
+        for row in grid:
+            for cell in row:
+                model.colors[i] = color_code(cell.get('color', "black"))
+                model.chars[i] = char_code(cell.get('char', BLANK_CHAR))
+                i += 1
+        return model
+
+    def to_dicts(self):
+        return [[self.cell(r, c) for c in range(self.cols)] for r in range(self.rows)]
+
+    def to_rle(self):
+        """Runs of identical cells as [count, char, color], the "compressed_grid" project format."""
+        runs = []
+        if not self.colors: return runs
+        pairs = zip(self.colors, self.chars)
+        current = next(pairs)
+        count = 1
+        for pair in pairs:
+            if pair == current:
+                count += 1
+            else:
+                runs.append([count, _CHARS[current[1]], PALETTE[current[0]]])
+                current, count = pair, 1
+        runs.append([count, _CHARS[current[1]], PALETTE[current[0]]])
+        return runs
+
+    @classmethod
+    def from_rle(cls, runs, rows, cols):
+        """Inverse of to_rle; missing cells stay blank and extra cells are dropped."""
+        model = cls(rows, cols)
+        size = rows * cols
+        i = 0
+        for count, char, color in runs:
+            end = min(i + count, size)
+            model.colors[i:end] = bytes([color_code(color)]) * (end - i)
+            model.chars[i:end] = bytes([char_code(char)]) * (end - i)
+            i = end
+            if i >= size:
+                break
+        return model
+
+    def copy(self):
+        return GridModel(self.rows, self.cols, bytearray(self.colors), bytearray(self.chars))
+
+    def __eq__(self, other):
+        return (isinstance(other, GridModel) and (self.rows, self.cols) == (other.rows, other.cols)
+                and self.colors == other.colors and self.chars == other.chars)
+
+    # --- Cells ---
+    def index(self, r, c):
+        return r * self.cols + c
+
+    def in_bounds(self, r, c):
+        return 0 <= r < self.rows and 0 <= c < self.cols
+
+    def color(self, r, c):
+        return PALETTE[self.colors[r * self.cols + c]]
+
+    def char(self, r, c):
+        return _CHARS[self.chars[r * self.cols + c]]
+
+    def cell(self, r, c):
+        """The legacy {'char', 'color'} dict for one cell (a new dict each call)."""
+        return {'char': self.char(r, c), 'color': self.color(r, c)}
+
+    def set_color(self, r, c, color):
+        self.colors[r * self.cols + c] = color_code(color)
+
+    def set_char(self, r, c, char):
+        self.chars[r * self.cols + c] = char_code(char)
+
+    def set(self, r, c, color, char):
+        i = r * self.cols + c
+        self.colors[i] = color_code(color)
+        self.chars[i] = char_code(char)
+
+    def iter_cells(self):
+        """Yields (color, char) names in row-major order."""
+        for color, char in zip(self.colors, self.chars):
+            yield PALETTE[color], _CHARS[char]
+
+    def clear(self):
+        self.colors[:] = bytes(len(self.colors))
+        self.chars[:] = bytes(len(self.chars))
+
+    # --- Rows / Regions ---
+    def row_colors(self, r):
+        """Zero-copy view of one row's palette indexes."""
+        return memoryview(self.colors)[r * self.cols:(r + 1) * self.cols]
+
+    def row_chars(self, r):
+        return memoryview(self.chars)[r * self.cols:(r + 1) * self.cols]
+
+    def region(self, min_r, min_c, max_r, max_c):
+        """Copies the inclusive box into a new model (one slice per row)."""
+        rows, cols = max_r - min_r + 1, max_c - min_c + 1
+        out = GridModel(rows, cols)
+        for r in range(rows):
+            src = (min_r + r) * self.cols + min_c
+            out.colors[r * cols:(r + 1) * cols] = self.colors[src:src + cols]
+            out.chars[r * cols:(r + 1) * cols] = self.chars[src:src + cols]
+        return out
+
+    def paste(self, other, top, left):
+        """Copies `other` with its top-left at (top, left), clipped to this grid."""
+        c0, c1 = max(left, 0), min(left + other.cols, self.cols)
+        if c0 >= c1: return
+        for r in range(max(top, 0), min(top + other.rows, self.rows)):
+            src = (r - top) * other.cols + (c0 - left)
+            dst = r * self.cols
+            self.colors[dst + c0:dst + c1] = other.colors[src:src + c1 - c0]
+            self.chars[dst + c0:dst + c1] = other.chars[src:src + c1 - c0]
+
+    def clear_region(self, min_r, min_c, max_r, max_c):
+        width = max_c - min_c + 1
+        blank = bytes(width)
+        for r in range(min_r, max_r + 1):
+            start = r * self.cols + min_c
+            self.colors[start:start + width] = blank
+            self.chars[start:start + width] = blank
+
+    def fill(self, r, c, color, match_colors=None, match_char=False, bounds=None):
+        """
+        Scanline flood fill from (r, c) with `color`. Cells join the fill when their
+        palette index is in `match_colors` (default: the seed's color) and, with
+        `match_char`, their char equals the seed's. `bounds` (min_r, min_c, max_r,
+        max_c) limits the fill, e.g. to a selection. Returns the bounding box of
+        the filled cells, or None if nothing was filled.
+        """
+        min_r, min_c, max_r, max_c = bounds if bounds else (0, 0, self.rows - 1, self.cols - 1)
+        if not (min_r <= r <= max_r and min_c <= c <= max_c): return None
+
+        cols, colors, chars = self.cols, self.colors, self.chars
+        seed = r * cols + c
+        code = color_code(color)
+        ok_color = bytearray(256) # Palette index -> 1 if it matches, one lookup per cell
+        for m in (match_colors if match_colors is not None else (colors[seed],)):
+            ok_color[m] = 1
+        if match_colors is None and colors[seed] == code:
+            return None # Exact fill with the same color changes nothing
+        seed_char = chars[seed]
+        seen = bytearray(len(colors))
+
+        def matches(i):
+            return not seen[i] and ok_color[colors[i]] and (not match_char or chars[i] == seed_char)
+
+        box = None
+        stack = [(r, c)]
+        while stack:
+            r, c = stack.pop()
+            row = r * cols
+            if not matches(row + c): continue
+
+            # Grow the run left and right, then fill it with one slice write
+            lo = hi = c
+            while lo > min_c and matches(row + lo - 1): lo -= 1
+            while hi < max_c and matches(row + hi + 1): hi += 1
+            colors[row + lo:row + hi + 1] = bytes([code]) * (hi - lo + 1)
+            seen[row + lo:row + hi + 1] = b"\x01" * (hi - lo + 1)
+            box = (min(box[0], r), min(box[1], lo), max(box[2], r), max(box[3], hi)) if box else (r, lo, r, hi)
+
+            # Queue the start of each matching run in the rows above and below
+            for nr in (r - 1, r + 1):
+                if not min_r <= nr <= max_r: continue
+                nrow = nr * cols
+                in_run = False
+                for x in range(lo, hi + 1):
+                    if matches(nrow + x):
+                        if not in_run: stack.append((nr, x))
+                        in_run = True
+                    else:
+                        in_run = False
+        return box
+
+    def resized(self, rows, cols):
+        """New rows x cols model keeping this grid's cells at the top-left (cropped if smaller)."""
+        out = GridModel(rows, cols)
+        out.paste(self, 0, 0)
+        return out
+
+    # --- Panel Tiles ---
+    def tile_count(self, size):
+        return (self.rows // size) * (self.cols // size)
+
+    def tile_origin(self, index, size):
+        """Top-left (r, c) of tile `index`; tiles are numbered row-major across the wall."""
+        per_row = self.cols // size
+        return (index // per_row) * size, (index % per_row) * size
+
+    def tiles(self, size):
+        """Splits the wall into size x size panel models, row-major (tile index == EEPROM Location)."""
+        out = []
+        for index in range(self.tile_count(size)):
+            r, c = self.tile_origin(index, size)
+            out.append(self.region(r, c, r + size - 1, c + size - 1))
+        return out
+
+    # --- Transforms ---
+    def transformed(self, action, dr=0, dc=0):
+        """
+        New model with `action` applied: 'flip_h', 'flip_v', 'rotate' (90 degrees
+        clockwise), 'rotate_ccw', 'rotate_180', 'transpose', or 'shift' (wrap-around
+        by dr rows, dc cols). 'rotate', 'rotate_ccw' and 'transpose' swap the dimensions.
+        """
+        rows, cols, gather = _permutation(action, self.rows, self.cols, dr, dc)
+        return GridModel(rows, cols, bytearray(gather(self.colors)), bytearray(gather(self.chars)))
+
+    def shifted(self, dr, dc, wrap=False):
+        """Moves every cell by (dr, dc); cells pushed off one edge come back on the other with `wrap`, else they are dropped."""
+        if wrap:
+            return self.transformed('shift', dr, dc)
+        out = GridModel(self.rows, self.cols)
+        out.paste(self, dr, dc)
+        return out
+
+    def transform_region(self, action, min_r, min_c, max_r, max_c, dr=0, dc=0):
+        """Applies `action` in place to the inclusive box. Raises ValueError if it would change the box's shape."""
+        part = self.region(min_r, min_c, max_r, max_c).transformed(action, dr, dc)
+        if (part.rows, part.cols) != (max_r - min_r + 1, max_c - min_c + 1):
+            raise ValueError("Only a square selection can be rotated or transposed.")
+        self.paste(part, min_r, min_c)
+
+
+# Output (r, c) -> source (r, c) for each transform of a rows x cols grid
+_SOURCES = {
+    'flip_h': lambda r, c, rows, cols, dr, dc: (r, cols - 1 - c),
+    'flip_v': lambda r, c, rows, cols, dr, dc: (rows - 1 - r, c),
+    'rotate_180': lambda r, c, rows, cols, dr, dc: (rows - 1 - r, cols - 1 - c),
+    'rotate': lambda r, c, rows, cols, dr, dc: (rows - 1 - c, r),
+    'rotate_ccw': lambda r, c, rows, cols, dr, dc: (c, cols - 1 - r),
+    'transpose': lambda r, c, rows, cols, dr, dc: (c, r),
+    'shift': lambda r, c, rows, cols, dr, dc: ((r - dr) % rows, (c - dc) % cols),
+}
+_SWAPS_DIMS = {'rotate', 'rotate_ccw', 'transpose'}
+_PERMUTATIONS = {} # (action, rows, cols, dr, dc) -> (out_rows, out_cols, gather)
+_MAX_PERMUTATIONS = 64
+
+
+def _permutation(action, rows, cols, dr=0, dc=0):
+    """
+    Index permutation for a transform, as a C-level itemgetter that gathers a
+    whole plane in one call. Built once per shape and reused for every plane,
+    grid and selection of that shape.
+    """
+    if action not in _SOURCES:
+        raise ValueError(f"Unknown transform: {action}")
+    if action == 'shift':
+        dr, dc = dr % rows, dc % cols
+    else:
+        dr = dc = 0
+    key = (action, rows, cols, dr, dc)
+    cached = _PERMUTATIONS.get(key)
+    if cached: return cached
+
+    out_rows, out_cols = (cols, rows) if action in _SWAPS_DIMS else (rows, cols)
+    source = _SOURCES[action]
+    order = []
+    for r in range(out_rows):
+        for c in range(out_cols):
+            sr, sc = source(r, c, rows, cols, dr, dc)
+            order.append(sr * cols + sc)
+
+    if len(order) == 1:
+        gather = lambda plane, i=order[0]: (plane[i],) # itemgetter with one index returns a scalar
+    else:
+        gather = itemgetter(*order)
+    if len(_PERMUTATIONS) >= _MAX_PERMUTATIONS:
+        _PERMUTATIONS.clear()
+    _PERMUTATIONS[key] = (out_rows, out_cols, gather)
+    return _PERMUTATIONS[key]
@@ -0,0 +1,243 @@
+# image_import.py
+"""
+Converts artwork into Pixel Designer color planes.
+
+The image is resampled to the grid size with Pillow, and then each pixel is
+mapped to the nearest panel color. The nearest color comes from a 32x32x32
+RGB lookup table that is built once per palette, so each pixel costs one
+index instead of 15 distance checks. Two kinds of dithering are available.
+Floyd-Steinberg carries each pixel's rounding error on to its neighbours.
+Ordered dithering adds a fixed 4x4 Bayer offset before the lookup. When
+NumPy is installed, the table build, the lookups and ordered dithering run
+vectorized. Without it, the same steps run in plain Python.
+
+Animations (an animated GIF or a folder of frames) are streamed one frame at
+a time through a small thread pool and deduplicated as they arrive.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageSequence
+
+DITHER_MODES = ("None", "Floyd-Steinberg", "Ordered")
+IMAGE_FILETYPES = [("Images", "*.png *.jpg *.jpeg *.bmp *.gif"), ("All Files", "*.*")]
+FRAME_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif")
+
+DEFAULT_NEAR_CELLS = 2 # A frame differing from a kept one in at most this many cells counts as a repeat
+
+LUT_BITS = 5 # Bits kept per channel when indexing the lookup table
+LUT_SHIFT = 8 - LUT_BITS
+ORDERED_STRENGTH = 64 # RGB spread of the ordered-dither offsets
+
+BAYER_4 = ((0, 8, 2, 10), (12, 4, 14, 6), (3, 11, 1, 9), (15, 7, 13, 5))
+
+_LUTS = {} # palette -> lookup table
+
+
+def _numpy():
+    """NumPy if it is installed, else None (it is optional)."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def palette_lut(palette_rgb):
+    """
+    Nearest palette index for every 15-bit RGB cell, as a bytearray of 32768 entries.
+    Index a color with lut_index(r, g, b).
+    """
+    key = tuple(palette_rgb)
+    lut = _LUTS.get(key)
+    if lut is not None:
+        return lut
+
+    size = 1 << LUT_BITS
+    centers = [(v << LUT_SHIFT) + (1 << LUT_SHIFT) // 2 for v in range(size)]
+    np = _numpy()
+    if np:
+        grid = np.array(centers, dtype=np.int32)
+        cube = np.stack(np.meshgrid(grid, grid, grid, indexing="ij"), axis=-1).reshape(-1, 1, 3)
+        dist = ((cube - np.array(key, dtype=np.int32).reshape(1, -1, 3)) ** 2).sum(axis=2)
+        lut = bytearray(dist.argmin(axis=1).astype(np.uint8).tobytes())
+    else:
+        # Squared distance per channel value and palette entry, summed per cell
+        per_channel = [[[(v - p[ch]) ** 2 for p in key] for v in centers] for ch in range(3)]
+        entries = range(len(key))
+        lut = bytearray()
+        for dr in per_channel[0]:
+            for dg in per_channel[1]:
+                rg = [dr[i] + dg[i] for i in entries]
+                for db in per_channel[2]:
+                    best = min(entries, key=lambda i: rg[i] + db[i])
+                    lut.append(best)
+    _LUTS[key] = lut
+    return lut
+
+
+def lut_index(r, g, b):
+    return ((r >> LUT_SHIFT) << (2 * LUT_BITS)) | ((g >> LUT_SHIFT) << LUT_BITS) | (b >> LUT_SHIFT)
+
+
+def quantize_pixels(pixels, width, palette_rgb, dither="None"):
+    """
+    Maps row-major (r, g, b) pixels to palette indexes; returns a bytearray.
+    `dither` is one of DITHER_MODES.
+    """
+    lut = palette_lut(palette_rgb)
+    if dither == "Floyd-Steinberg":
+        return _floyd_steinberg(pixels, width, palette_rgb, lut)
+
+    np = _numpy()
+    if np:
+        rgb = np.asarray(pixels, dtype=np.int32).reshape(-1, 3)
+        if dither == "Ordered":
+            rgb = np.clip(rgb + _bayer_offsets(np, len(pixels), width)[:, None], 0, 255)
+        idx = ((rgb[:, 0] >> LUT_SHIFT) << (2 * LUT_BITS)) | ((rgb[:, 1] >> LUT_SHIFT) << LUT_BITS) | (rgb[:, 2] >> LUT_SHIFT)
+        return bytearray(np.frombuffer(bytes(lut), dtype=np.uint8)[idx].tobytes())
+
+    out = bytearray(len(pixels))
+    for i, (r, g, b) in enumerate(pixels):
+        if dither == "Ordered":
+            y, x = divmod(i, width)
+            off = _bayer_offset(y, x)
+            r, g, b = _clamp(r + off), _clamp(g + off), _clamp(b + off)
+        out[i] = lut[lut_index(r, g, b)]
+    return out
+
+
+def _bayer_offset(y, x):
+    return int(((BAYER_4[y % 4][x % 4] + 0.5) / 16 - 0.5) * ORDERED_STRENGTH)
+
+
+def _bayer_offsets(np, count, width):
+    ys, xs = np.divmod(np.arange(count), width)
+    bayer = np.array(BAYER_4, dtype=np.float64)
+    return (((bayer[ys % 4, xs % 4] + 0.5) / 16 - 0.5) * ORDERED_STRENGTH).astype(np.int32)
+
+
+def _clamp(v):
+    return 0 if v < 0 else 255 if v > 255 else int(v)
+
+
+def _floyd_steinberg(pixels, width, palette_rgb, lut):
+    """Error diffusion; each pixel depends on the ones before it, so this runs row by row."""
+    height = len(pixels) // width
+    work = [list(p) for p in pixels]
+    out = bytearray(len(pixels))
+    for y in range(height):
+        for x in range(width):
+            i = y * width + x
+            r, g, b = (_clamp(v) for v in work[i])
+            best = lut[lut_index(r, g, b)]
+            out[i] = best
+            pr, pg, pb = palette_rgb[best]
+            err = (r - pr, g - pg, b - pb)
+            for dx, dy, weight in ((1, 0, 7), (-1, 1, 3), (0, 1, 5), (1, 1, 1)):
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < width and ny < height:
+                    target = work[ny * width + nx]
+                    for ch in range(3):
+                        target[ch] += err[ch] * weight / 16
+    return out
+
+
+def flatten(image, background=(0, 0, 0)):
+    """RGB copy of `image` with any transparency composited onto `background` (blank cells)."""
+    if image.mode in ("RGBA", "LA", "P"):
+        rgba = image.convert("RGBA")
+        base = Image.new("RGBA", rgba.size, background + (255,))
+        return Image.alpha_composite(base, rgba).convert("RGB")
+    return image.convert("RGB")
+
+
+def image_to_colors(image, rows, cols, palette_rgb, dither="None"):
+    """Resamples a PIL image to cols x rows and quantizes it; returns the palette-index plane."""
+    resample = getattr(Image, "Resampling", Image).LANCZOS
+    small = flatten(image).resize((cols, rows), resample)
+    return quantize_pixels(list(small.getdata()), cols, palette_rgb, dither)
+
+
+# --- Frame Sequences ---
+class FrameImport:
+    """Unique frames of an animation plus what happened to every source frame."""
+
+    def __init__(self):
+        self.frames = []     # Unique palette-index planes, in first-seen order
+        self.sequence = []   # For each source frame: index into frames, or None if it was dropped
+        self.duplicates = 0  # Exact repeats of a kept frame
+        self.near_duplicates = 0
+        self.over_limit = 0  # Unique frames that did not fit
+
+    @property
+    def total(self):
+        return len(self.sequence)
+
+    def report(self):
+        return (f"{self.total} frame(s): {len(self.frames)} unique kept, {self.duplicates} duplicate, "
+                f"{self.near_duplicates} near-duplicate, {self.over_limit} dropped over the limit.")
+
+
+def iter_frames(path):
+    """Yields the frames of an animated image, or of every image in a folder (sorted by name), one at a time."""
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.lower().endswith(FRAME_EXTENSIONS):
+                with Image.open(os.path.join(path, name)) as img:
+                    yield img.copy()
+        return
+    with Image.open(path) as img:
+        for frame in ImageSequence.Iterator(img):
+            yield frame.copy() # The iterator reuses one image object as it seeks
+
+
+def cell_difference(a, b, limit):
+    """Number of differing cells between two planes, counting no further than limit + 1."""
+    diff = 0
+    for x, y in zip(a, b):
+        if x != y:
+            diff += 1
+            if diff > limit: break
+    return diff
+
+
+def import_frames(frames, rows, cols, palette_rgb, dither="None", max_frames=16,
+                  near_cells=DEFAULT_NEAR_CELLS, workers=None):
+    """
+    Quantizes an iterable of PIL frames to rows x cols planes and keeps at most
+    `max_frames` unique ones. Frames are converted on a thread pool (Pillow
+    releases the GIL while resampling) with a bounded window, so only a few
+    decoded frames are held at once. Returns a FrameImport.
+    """
+    result = FrameImport()
+    seen = {} # plane bytes -> frame index
+    workers = workers or min(4, os.cpu_count() or 1)
+
+    def keep(plane):
+        key = bytes(plane)
+        if key in seen:
+            result.duplicates += 1
+            return seen[key]
+        for i, kept in enumerate(result.frames):
+            if cell_difference(plane, kept, near_cells) <= near_cells:
+                result.near_duplicates += 1
+                return i
+        if len(result.frames) >= max_frames:
+            result.over_limit += 1
+            return None
+        seen[key] = len(result.frames)
+        result.frames.append(plane)
+        return seen[key]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        window = deque()
+        for frame in frames:
+            window.append(pool.submit(image_to_colors, frame, rows, cols, palette_rgb, dither))
+            if len(window) >= workers * 2:
+                result.sequence.append(keep(window.popleft().result())) # Frames stay in source order
+        while window:
+            result.sequence.append(keep(window.popleft().result()))
+    return result
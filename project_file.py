@@ -0,0 +1,315 @@
+# project_file.py
+"""
+Binary project container (.blp), alongside the JSON project format.
+
+Layout (little-endian):
+
+    header    magic "BLPJ", format version (u16), flags (u16, bit 0 = 16-bit mode),
+              section count (u16), padded to 16 bytes
+    table     one (tag, offset, length) entry per section: 4s, u32, u32
+    sections  each starts on a 4-byte boundary
+
+    GRID  rows, cols (u16), the chars used (u8 count, then u8-length UTF-8 strings),
+          then the color plane and the char plane, one byte per cell
+    CMAP  entry count (u16), then per char: u8-length UTF-8 char, u8 7-bit value
+    FILS  files_to_encode: count (u16), then u16-length UTF-8 names
+    VIRT  virtual files: count (u16), then per file a u16-length UTF-8 name, kind (u8),
+          data offset and byte length (u32, from the section start); then the data
+
+A virtual file whose text is exactly the designer's one-binary-line-per-pixel
+form is stored as packed 16-bit words (kind 0), 2 bytes per pixel instead of
+17. Any other text is stored as UTF-8 (kind 1), so nothing is lost. Every
+section except the header is optional, and readers skip tags they do not
+know. load() memory-maps the file and decodes each virtual file only when
+it is first read.
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import MutableMapping
+
+import decoder_core
+import encoder_core
+from grid_model import GridModel, char_code, char_of
+
+MAGIC = b"BLPJ"
+FORMAT_VERSION = 1
+PROJECT_EXT = ".blp"
+FLAG_16BIT = 0x0001
+
+_HEADER = struct.Struct("<4sHHH6x")
+_ENTRY = struct.Struct("<4sII")
+_VIRT_ENTRY = struct.Struct("<BII")
+
+KIND_WORDS = 0
+KIND_TEXT = 1
+
+
+class ProjectFormatError(ValueError):
+    pass
+
+
+def is_binary_project(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+# --- Packing helpers ---
+def _pack_str(text, width="B"):
+    data = text.encode("utf-8")
+    return struct.pack("<" + width, len(data)) + data
+
+
+def _read_str(buf, pos, width="B"):
+    size = struct.calcsize(width)
+    (length,) = struct.unpack_from("<" + width, buf, pos)
+    pos += size
+    return bytes(buf[pos:pos + length]).decode("utf-8"), pos + length
+
+
+def _words_to_bytes(words):
+    packed = array("H", words)
+    if sys.byteorder == "big": packed.byteswap()
+    return packed.tobytes()
+
+
+def _bytes_to_words(data):
+    words = array("H")
+    words.frombytes(data)
+    if sys.byteorder == "big": words.byteswap()
+    return words
+
+
+def pack_virtual_text(text):
+    """(kind, data) for one virtual file: packed words when that round-trips exactly, else UTF-8 text."""
+    lines = text.splitlines()
+    if len(lines) <= encoder_core.LOCATION_SIZE and all(len(line) == 16 and not line.strip("01") for line in lines):
+        words = [int(line, 2) for line in lines]
+        if decoder_core.words_to_text(words) == text:
+            return KIND_WORDS, _words_to_bytes(words)
+    return KIND_TEXT, text.encode("utf-8")
+
+
+def unpack_virtual_text(kind, data):
+    if kind == KIND_WORDS:
+        return decoder_core.words_to_text(_bytes_to_words(data))
+    if kind == KIND_TEXT:
+        return bytes(data).decode("utf-8")
+    raise ProjectFormatError(f"Unknown virtual file kind {kind}.")
+
+
+# --- Sections ---
+def _grid_section(grid):
+    codes = sorted(set(grid.chars)) or [0] # File-local char table; process char codes are not stable
+    local = bytearray(256)
+    for i, code in enumerate(codes):
+        local[code] = i
+    out = struct.pack("<HHB", grid.rows, grid.cols, len(codes) - 1)
+    out += b"".join(_pack_str(char_of(code)) for code in codes)
+    return out + bytes(grid.colors) + bytes(grid.chars).translate(local)
+
+
+def _read_grid(buf):
+    rows, cols, last = struct.unpack_from("<HHB", buf, 0)
+    pos = 5
+    codes = bytearray(256)
+    for i in range(last + 1):
+        char, pos = _read_str(buf, pos)
+        codes[i] = char_code(char)
+    size = rows * cols
+    colors = bytearray(buf[pos:pos + size])
+    chars = bytearray(bytes(buf[pos + size:pos + 2 * size]).translate(bytes(codes)))
+    if len(colors) != size or len(chars) != size:
+        raise ProjectFormatError("GRID section is truncated.")
+    return GridModel(rows, cols, colors, chars)
+
+
+def _charmap_section(binary_chars):
+    out = struct.pack("<H", len(binary_chars))
+    for char, bits in binary_chars.items():
+        out += _pack_str(char) + struct.pack("<B", int(bits, 2))
+    return out
+
+
+def _read_charmap(buf):
+    (count,) = struct.unpack_from("<H", buf, 0)
+    pos, chars = 2, {}
+    for _ in range(count):
+        char, pos = _read_str(buf, pos)
+        chars[char] = "{:07b}".format(buf[pos])
+        pos += 1
+    return chars
+
+
+def _files_section(files):
+    return struct.pack("<H", len(files)) + b"".join(_pack_str(name, "H") for name in files)
+
+
+def _read_files(buf):
+    (count,) = struct.unpack_from("<H", buf, 0)
+    pos, files = 2, []
+    for _ in range(count):
+        name, pos = _read_str(buf, pos, "H")
+        files.append(name)
+    return files
+
+
+def _virtual_section(virtual_files):
+    packed = [(name,) + pack_virtual_text(text) for name, text in virtual_files.items()]
+    index_size = 2 + sum(len(_pack_str(name, "H")) + _VIRT_ENTRY.size for name, _, _ in packed)
+    index, blobs = [struct.pack("<H", len(packed))], []
+    offset = index_size + (-index_size % 2) # Word data starts 2-byte aligned
+    for name, kind, data in packed:
+        index.append(_pack_str(name, "H") + _VIRT_ENTRY.pack(kind, offset, len(data)))
+        blobs.append(data + b"\0" * (len(data) % 2))
+        offset += len(blobs[-1])
+    head = b"".join(index)
+    return head + b"\0" * (-len(head) % 2) + b"".join(blobs)
+
+
+class LazyVirtualFiles(MutableMapping):
+    """
+    The VIRT section as a dict-like mapping. Each file's text is decoded from the
+    mapped file the first time it is read; assignments and deletions only touch
+    memory. Call close() before overwriting the project file.
+    """
+
+    def __init__(self, buf, entries):
+        self._buf = buf # The mmap (or bytes) holding the data
+        self._entries = entries # name -> (kind, offset, length) for files not decoded yet
+        self._texts = {name: None for name in entries} # Keeps file order; None = not decoded yet
+
+    def __getitem__(self, name):
+        text = self._texts[name]
+        if text is None:
+            kind, offset, length = self._entries.pop(name)
+            text = self._texts[name] = unpack_virtual_text(kind, self._buf[offset:offset + length])
+            if not self._entries and isinstance(self._buf, mmap.mmap):
+                self._buf.close() # Everything is decoded; release the file
+                self._buf = None
+        return text
+
+    def __setitem__(self, name, text):
+        self._entries.pop(name, None)
+        self._texts[name] = text
+
+    def __delitem__(self, name):
+        del self._texts[name]
+        self._entries.pop(name, None)
+
+    def __contains__(self, name):
+        return name in self._texts # Membership must not decode the file
+
+    def __iter__(self):
+        return iter(self._texts)
+
+    def __len__(self):
+        return len(self._texts)
+
+    @property
+    def pending(self):
+        """Number of files not decoded yet."""
+        return len(self._entries)
+
+    def close(self):
+        """Decodes what is left and releases the mapped file; returns a plain dict."""
+        texts = {name: self[name] for name in list(self._texts)}
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+        self._buf = None
+        return texts
+
+
+def _read_virtual(buf, base, size):
+    """Parses the VIRT index at `base` in `buf` (the mmap); file data stays in `buf` until read."""
+    (count,) = struct.unpack_from("<H", buf, base)
+    pos, entries = base + 2, {}
+    for _ in range(count):
+        name, pos = _read_str(buf, pos, "H")
+        kind, offset, length = _VIRT_ENTRY.unpack_from(buf, pos)
+        pos += _VIRT_ENTRY.size
+        if offset + length > size:
+            raise ProjectFormatError(f"Virtual file {name} runs past the end of its section.")
+        entries[name] = (kind, base + offset, length)
+    return LazyVirtualFiles(buf, entries)
+
+
+# --- Save / Load ---
+def save(path, grid=None, binary_chars=None, files_to_encode=None, virtual_files=None, type16=True):
+    """Writes a .blp project. Sections left as None are omitted."""
+    sections = []
+    if grid is not None: sections.append((b"GRID", _grid_section(grid)))
+    if binary_chars is not None: sections.append((b"CMAP", _charmap_section(binary_chars)))
+    if files_to_encode is not None: sections.append((b"FILS", _files_section(files_to_encode)))
+    if virtual_files is not None: sections.append((b"VIRT", _virtual_section(virtual_files)))
+
+    pos = _HEADER.size + _ENTRY.size * len(sections)
+    table, body = [], []
+    for tag, data in sections:
+        pad = -pos % 4
+        body.append(b"\0" * pad + data)
+        pos += pad
+        table.append(_ENTRY.pack(tag, pos, len(data)))
+        pos += len(data)
+
+    flags = FLAG_16BIT if type16 else 0
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, flags, len(sections)))
+        f.write(b"".join(table))
+        f.write(b"".join(body))
+
+
+def load(path):
+    """
+    Reads a .blp project into a dict like the JSON project: "grid" (GridModel or None),
+    "binary_chars", "files_to_encode", "virtual_files" (a LazyVirtualFiles) and "is_16bit".
+    The file stays mapped until every virtual file has been read or
+    virtual_files.close() is called. Raises ProjectFormatError on a bad or newer file.
+    """
+    with open(path, "rb") as f:
+        try:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError: # Empty file
+            raise ProjectFormatError("Not a BuildLogic project file.")
+    try:
+        if len(mapping) < _HEADER.size:
+            raise ProjectFormatError("Not a BuildLogic project file.")
+        magic, version, flags, count = _HEADER.unpack_from(mapping, 0)
+        if magic != MAGIC:
+            raise ProjectFormatError("Not a BuildLogic project file.")
+        if version > FORMAT_VERSION:
+            raise ProjectFormatError(f"Project format v{version} is newer than this app supports (v{FORMAT_VERSION}).")
+
+        sections = {}
+        for i in range(count):
+            tag, offset, length = _ENTRY.unpack_from(mapping, _HEADER.size + i * _ENTRY.size)
+            if offset + length > len(mapping):
+                raise ProjectFormatError(f"Section {tag.decode('ascii', 'replace')} runs past the end of the file.")
+            sections[tag] = (offset, length)
+
+        def small(tag): # Small sections are copied out and parsed right away
+            offset, length = sections[tag]
+            return mapping[offset:offset + length]
+
+        project = {
+            "grid": _read_grid(small(b"GRID")) if b"GRID" in sections else None,
+            "binary_chars": _read_charmap(small(b"CMAP")) if b"CMAP" in sections else None,
+            "files_to_encode": _read_files(small(b"FILS")) if b"FILS" in sections else [],
+            "is_16bit": bool(flags & FLAG_16BIT),
+            "virtual_files": _read_virtual(mapping, *sections[b"VIRT"]) if b"VIRT" in sections else LazyVirtualFiles(b"", {}),
+        }
+    except (struct.error, UnicodeDecodeError) as e:
+        mapping.close()
+        raise ProjectFormatError(f"Corrupt project file: {e}")
+    except ProjectFormatError:
+        mapping.close()
+        raise
+
+    if b"VIRT" not in sections:
+        mapping.close()
+    return project
@@ -0,0 +1,63 @@
+# source_watch.py
+"""
+Cheap change detection for encoder source files edited in external tools.
+
+SourceWatcher only calls os.stat on the watched paths, so polling a full
+16-file project once a second costs next to nothing. A change is reported
+once the file has stopped changing for `debounce` seconds, so an editor that
+saves in several writes triggers a single re-encode.
+"""
+
+import os
+import time
+
+DEFAULT_DEBOUNCE = 0.75 # Seconds a file must stay unchanged before it is reported
+
+
+def file_stamp(path):
+    """(mtime_ns, size) of a file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class SourceWatcher:
+    def __init__(self, debounce=DEFAULT_DEBOUNCE):
+        self.debounce = debounce
+        self.stamps = {}  # path -> last seen stamp
+        self.pending = {} # path -> time of the most recent change not yet reported
+
+    def track(self, paths):
+        """Sets the watched paths. New paths start from their current stamp (no change reported)."""
+        paths = set(paths)
+        for path in list(self.stamps):
+            if path not in paths:
+                del self.stamps[path]
+                self.pending.pop(path, None)
+        for path in paths:
+            if path not in self.stamps:
+                self.stamps[path] = file_stamp(path)
+
+    def reset(self, paths):
+        """Forgets all stamps and pending changes and starts over from the files as they are now."""
+        self.stamps.clear()
+        self.pending.clear()
+        self.track(paths)
+
+    def poll(self, now=None):
+        """Returns the paths whose changes have settled since the last call (sorted)."""
+        if now is None:
+            now = time.monotonic()
+
+        for path, old in self.stamps.items():
+            stamp = file_stamp(path)
+            if stamp != old:
+                self.stamps[path] = stamp
+                self.pending[path] = now # Each write in a burst restarts the debounce
+
+        settled = sorted(p for p, t in self.pending.items() if now - t >= self.debounce)
+        for path in settled:
+            del self.pending[path]
+        return settled
@@ -0,0 +1,73 @@
+# wall_compositor.py
+"""
+Cuts a large image or design into 16x16 panel tiles for the encoder.
+
+Identical tiles (e.g. the plain background of a big wall) are stored once.
+The result is the list of unique tiles, each one encoder file and so one
+Location. A placement map then says which tile every panel of the wall
+shows. That way a wall with more panels than the EEPROM has Locations still
+fits, provided it has no more than 16 distinct panels.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import image_import
+from grid_model import GridModel
+
+
+class WallLayout:
+    def __init__(self, panels_wide, panels_high):
+        self.panels_wide = panels_wide
+        self.panels_high = panels_high
+        self.tiles = []     # Unique GridModel tiles; index == position in the encoder list
+        self.placement = [] # Tile index per panel, row-major across the wall
+
+    @property
+    def panel_count(self):
+        return self.panels_wide * self.panels_high
+
+    def placement_rows(self):
+        return [self.placement[r * self.panels_wide:(r + 1) * self.panels_wide] for r in range(self.panels_high)]
+
+    def placement_text(self, first_location=0):
+        """One line per panel row, the Location each panel shows (tile index + first_location)."""
+        return "\n".join(" ".join(f"{t + first_location:>2}" for t in row) for row in self.placement_rows())
+
+
+def dedupe_tiles(tiles, panels_wide, panels_high):
+    """Builds a WallLayout from row-major panel tiles, keeping the first copy of each distinct tile."""
+    layout = WallLayout(panels_wide, panels_high)
+    seen = {} # (colors, chars) bytes -> tile index
+    for tile in tiles:
+        key = (bytes(tile.colors), bytes(tile.chars))
+        index = seen.get(key)
+        if index is None:
+            index = seen[key] = len(layout.tiles)
+            layout.tiles.append(tile)
+        layout.placement.append(index)
+    return layout
+
+
+def composite_design(model, size=16):
+    """Splits a designer wall (a GridModel whose sides are multiples of `size`) into a WallLayout."""
+    return dedupe_tiles(model.tiles(size), model.cols // size, model.rows // size)
+
+
+def composite_image(image, panels_wide, panels_high, palette_rgb, dither="None", size=16, workers=None):
+    """
+    Resamples a PIL image to the whole wall once, then quantizes its panel tiles
+    on a thread pool and deduplicates them. Tiles are cropped on the aligned
+    panel grid, so ordered dithering lines up across tile edges.
+    """
+    resample = getattr(image_import.Image, "Resampling", image_import.Image).LANCZOS
+    wall = image_import.flatten(image).resize((panels_wide * size, panels_high * size), resample)
+    boxes = [(c * size, r * size, (c + 1) * size, (r + 1) * size) for r in range(panels_high) for c in range(panels_wide)]
+
+    def tile(box):
+        pixels = list(wall.crop(box).getdata())
+        return GridModel(size, size, image_import.quantize_pixels(pixels, size, palette_rgb, dither))
+
+    with ThreadPoolExecutor(max_workers=workers or min(4, os.cpu_count() or 1)) as pool:
+        tiles = list(pool.map(tile, boxes)) # map keeps the row-major panel order
+    return dedupe_tiles(tiles, panels_wide, panels_high)
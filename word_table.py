@@ -0,0 +1,74 @@
+# word_table.py
+"""
+Precomputed EEPROM words for every (palette color, char) pair.
+
+A designer cell's word is its 3 leading bits ("111" in 16-bit mode, "000"
+in 8-bit mode), then its 6 color bits, then its 7 char bits. A WordTable
+builds every combination once for a given charmap and mode, indexed by the
+GridModel codes, so a cell's word is one list index. The table has to be
+rebuilt whenever the charmap or the mode changes.
+"""
+
+from array import array
+
+import grid_model
+
+CHAR_SLOTS = 256 # Char codes per color row of the table (codes are one byte)
+
+
+class WordTable:
+    def __init__(self, binary_chars, color_bits, type16=True):
+        """`color_bits` maps palette names to their 6-bit strings (COLOR_MAP)."""
+        self.binary_chars = binary_chars
+        self.type16 = type16
+        self.leading_bits = "111" if type16 else "000"
+        self.color_bits = [color_bits[name] for name in grid_model.PALETTE]
+        self.texts = [] # Index: color_code * CHAR_SLOTS + char_code
+        self.words = array("H")
+        self.char_codes = 0
+        self._extend()
+
+    def _extend(self):
+        """Adds entries for char codes interned since the table was built."""
+        count = grid_model.char_count()
+        if count == self.char_codes: return
+        if not self.texts:
+            self.texts = [None] * (len(self.color_bits) * CHAR_SLOTS)
+            self.words = array("H", bytes(2 * len(self.texts)))
+        for code in range(self.char_codes, count):
+            char_bin = self.binary_chars.get(grid_model.char_of(code), "0000000").rjust(7, "0")
+            for color, color_bin in enumerate(self.color_bits):
+                text = self.leading_bits + color_bin + char_bin
+                self.texts[color * CHAR_SLOTS + code] = text
+                self.words[color * CHAR_SLOTS + code] = int(text, 2)
+        self.char_codes = count
+
+    def _ready(self, chars):
+        if chars and max(chars) >= self.char_codes:
+            self._extend()
+
+    def cell_text(self, model, r, c):
+        i = model.index(r, c)
+        self._ready((model.chars[i],))
+        return self.texts[model.colors[i] * CHAR_SLOTS + model.chars[i]]
+
+    def cell_word(self, model, r, c):
+        i = model.index(r, c)
+        self._ready((model.chars[i],))
+        return self.words[model.colors[i] * CHAR_SLOTS + model.chars[i]]
+
+    def code_word(self, color_code, char_code):
+        self._ready((char_code,))
+        return self.words[color_code * CHAR_SLOTS + char_code]
+
+    def model_texts(self, model):
+        """Source lines of a model, row-major."""
+        self._ready(model.chars)
+        texts = self.texts
+        return [texts[color * CHAR_SLOTS + char] for color, char in zip(model.colors, model.chars)]
+
+    def model_words(self, model):
+        """Integer words of a model, row-major, as array('H'); what the encoder would parse from model_texts."""
+        self._ready(model.chars)
+        words = self.words
+        return array("H", (words[color * CHAR_SLOTS + char] for color, char in zip(model.colors, model.chars)))